@@ -8,6 +8,8 @@ from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Any
 
+from lib import codec
+
 
 def aggregate_contributor_stats(repos_data_path: str, output_path: str):
     """
@@ -18,8 +20,8 @@ def aggregate_contributor_stats(repos_data_path: str, output_path: str):
         output_path: Path to save contributor-stats.json
     """
     
-    with open(repos_data_path, 'r') as f:
-        repos = json.load(f)
+    with open(repos_data_path, 'rb') as f:
+        repos = codec.load(f)
     
     # Aggregate contributor stats
     contributors = defaultdict(lambda: {
@@ -10,6 +10,8 @@ import os
 from datetime import datetime
 from typing import Dict, List, Tuple
 
+from lib import codec
+
 
 class BadgeGenerator:
     """Generate beautiful SVG badges for GitHub stats"""
@@ -30,8 +32,8 @@ class BadgeGenerator:
     
     def __init__(self, data_file: str = 'docs/repositories-data.json'):
         """Initialize with repository data"""
-        with open(data_file, 'r', encoding='utf-8') as f:
-            self.repositories = json.load(f)
+        with open(data_file, 'rb') as f:
+            self.repositories = codec.load(f)
         self.stats = self._calculate_stats()
     
     def _calculate_stats(self) -> Dict:
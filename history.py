@@ -1,4 +1,3 @@
-import requests
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import os
@@ -7,69 +6,50 @@ from typing import Dict, List, Tuple
 from tqdm import tqdm  # Import tqdm for the progress bar
 import argparse  # Import argparse
 
+from lib.github_api import GITHUB_API_BASE_URL, iter_github_pages
+
 
 def get_all_repositories(username: str, github_token: str) -> List[str]:
     """Fetches all public repositories for a given GitHub username."""
     repositories = []
-    page = 1
     per_page = 100
 
-    while True:
-        headers = {"Authorization": f"token {github_token}"}
-        url = f"https://api.github.com/users/{username}/repos?page={page}&per_page={per_page}"
-        response = requests.get(url, headers=headers)
-
-        if response.status_code == 200:
-            repos_data = response.json()
-            if not repos_data:
-                break
-            for repo in repos_data:
-                repositories.append(repo['full_name'])
-            page += 1
-        elif response.status_code == 403 and "rate limit" in response.text.lower():
-            print("Error: Rate limit exceeded.  Please wait and try again later.")
-            return []
-        elif response.status_code == 404:
-            print(f"Error: User '{username}' not found.")
-            return []
-        else:
-            print(f"Error fetching repositories: {response.status_code} - {response.text}")
+    headers = {"Authorization": f"token {github_token}"} if github_token else {}
+    url = f"{GITHUB_API_BASE_URL}/users/{username}/repos"
+
+    for response in iter_github_pages(url, headers, params={'per_page': per_page}):
+        if response is None:
+            # make_github_request already waited out rate limits and logged 404s
+            print(f"Error fetching repositories for '{username}'. See log for details.")
             return []
+        repos_data = response.json()
+        if not repos_data:
+            break
+        for repo in repos_data:
+            repositories.append(repo['full_name'])
     return repositories
 
 
 def get_stargazer_history(repo_full_name: str, github_token: str) -> List[Tuple[str, int]]:
     """Fetches the historical star count for a single repository."""
     stargazer_data = []
-    page = 1
     per_page = 100
 
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3.star+json"
-    }
-
-    while True:
-        url = f"https://api.github.com/repos/{repo_full_name}/stargazers?page={page}&per_page={per_page}"
-        response = requests.get(url, headers=headers)
+    headers = {"Accept": "application/vnd.github.v3.star+json"}
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    url = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}/stargazers"
 
-        if response.status_code == 200:
-            stars_page = response.json()
-            if not stars_page:
-                break
-
-            for star_info in stars_page:
-                stargazer_data.append((star_info['starred_at'], 0))
-
-            if 'next' not in response.links:
-                break
-            page += 1
-        elif response.status_code == 403 and "rate limit" in response.text.lower():
-            print("Error: Rate limit exceeded. Please wait or use a token.")
-            return []
-        else:
-            print(f"Error fetching stargazers for {repo_full_name}: {response.status_code} - {response.text}")
+    for response in iter_github_pages(url, headers, params={'per_page': per_page}):
+        if response is None:
+            print(f"Error fetching stargazers for {repo_full_name}. See log for details.")
             return []
+        stars_page = response.json()
+        if not stars_page:
+            break
+
+        for star_info in stars_page:
+            stargazer_data.append((star_info['starred_at'], 0))
 
     stargazer_data.sort()
     cumulative_count = 0
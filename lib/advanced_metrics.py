@@ -1,16 +1,62 @@
 """Advanced repository signals: momentum, issue health, bus factor, recent commits, top contributors."""
 
+import asyncio
 import datetime
 import logging
 
+from lib.codec import response_json
 from lib.github_api import GITHUB_API_BASE_URL, make_github_request
-from lib.utils import get_human_readable_time, parse_github_datetime
+from lib.utils import get_human_readable_time, get_run_now, parse_github_datetime
+
+
+def score_momentum(starred_at_values, current_stars):
+    """Score momentum from stargazer timestamps (ISO strings) and the current star count."""
+    now = get_run_now()
+    seven_days_ago = now - datetime.timedelta(days=7)
+    thirty_days_ago = now - datetime.timedelta(days=30)
+
+    stars_7d = 0
+    stars_30d = 0
+
+    for value in starred_at_values:
+        starred_at = parse_github_datetime(value)
+        if not starred_at:
+            continue
+
+        if starred_at >= seven_days_ago:
+            stars_7d += 1
+            stars_30d += 1
+        elif starred_at >= thirty_days_ago:
+            stars_30d += 1
+
+    weekly_rate = stars_7d / 7.0
+    monthly_rate = stars_30d / 30.0
+
+    acceleration = max(0, (weekly_rate - monthly_rate) * 10)
+    base_score = min(50, stars_7d * 2)
+    size_factor = min(30, (current_stars / 100) * 0.5)
+    score = min(100, base_score + acceleration + size_factor)
+
+    if stars_7d > 5:
+        trend = 'rising'
+    elif stars_7d > 0:
+        trend = 'growing'
+    else:
+        trend = 'stable'
+
+    return {
+        'score': round(score, 1),
+        'stars_7d': stars_7d,
+        'stars_30d': stars_30d,
+        'trend': trend
+    }
 
 
 def calculate_momentum_score(repo_full_name, current_stars, headers, console=None):
     """Calculate repository momentum based on recent star growth.
 
-    Returns dict with: score (0-100), stars_7d, stars_30d, trend.
+    Returns dict with: score (0-100), stars_7d, stars_30d, trend; None if the stargazers
+    couldn't be fetched (see empty_momentum for a placeholder).
     """
     try:
         stargazers_url = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}/stargazers"
@@ -21,61 +67,85 @@ def calculate_momentum_score(repo_full_name, current_stars, headers, console=Non
         response = make_github_request(stargazers_url, headers_with_accept, params=params, console=console)
 
         if not response or response.status_code != 200:
-            return {'score': 0, 'stars_7d': 0, 'stars_30d': 0, 'trend': 'stable'}
+            return None
 
-        stargazers = response.json()
+        stargazers = response_json(response)
         if not isinstance(stargazers, list):
-            return {'score': 0, 'stars_7d': 0, 'stars_30d': 0, 'trend': 'stable'}
-
-        now = datetime.datetime.now(datetime.timezone.utc)
-        seven_days_ago = now - datetime.timedelta(days=7)
-        thirty_days_ago = now - datetime.timedelta(days=30)
-
-        stars_7d = 0
-        stars_30d = 0
-
-        for star in stargazers:
-            starred_at = parse_github_datetime(star.get('starred_at'))
-            if not starred_at:
-                continue
-
-            if starred_at >= seven_days_ago:
-                stars_7d += 1
-                stars_30d += 1
-            elif starred_at >= thirty_days_ago:
-                stars_30d += 1
-
-        weekly_rate = stars_7d / 7.0
-        monthly_rate = stars_30d / 30.0
-
-        acceleration = max(0, (weekly_rate - monthly_rate) * 10)
-        base_score = min(50, stars_7d * 2)
-        size_factor = min(30, (current_stars / 100) * 0.5)
-        score = min(100, base_score + acceleration + size_factor)
-
-        if stars_7d > 5:
-            trend = 'rising'
-        elif stars_7d > 0:
-            trend = 'growing'
-        else:
-            trend = 'stable'
-
-        return {
-            'score': round(score, 1),
-            'stars_7d': stars_7d,
-            'stars_30d': stars_30d,
-            'trend': trend
-        }
+            return None
+
+        return score_momentum([star.get('starred_at') for star in stargazers], current_stars)
 
     except Exception as e:
         logging.warning(f"Error calculating momentum for {repo_full_name}: {e}")
-        return {'score': 0, 'stars_7d': 0, 'stars_30d': 0, 'trend': 'stable'}
+        return None
+
+
+def empty_momentum():
+    """Momentum placeholder for a repository whose stargazers couldn't be fetched."""
+    return {'score': 0, 'stars_7d': 0, 'stars_30d': 0, 'trend': 'stable'}
+
+
+def score_issue_health(issues, avg_resolution_time):
+    """Score issue health from recent open issues (dicts with created_at/updated_at ISO strings)."""
+    now = get_run_now()
+    ninety_days_ago = now - datetime.timedelta(days=90)
+
+    response_times = []
+    stale_count = 0
+
+    for issue in issues:
+        created_at = parse_github_datetime(issue.get('created_at'))
+        updated_at = parse_github_datetime(issue.get('updated_at'))
+
+        if not created_at:
+            continue
+
+        if updated_at and updated_at < ninety_days_ago:
+            stale_count += 1
+
+        if created_at and updated_at and created_at != updated_at:
+            response_time = (updated_at - created_at).total_seconds() / 3600
+            response_times.append(response_time)
+
+    avg_response_hours = sum(response_times) / len(response_times) if response_times else 0
+
+    score = 100
+
+    if avg_response_hours > 168:
+        score -= 40
+    elif avg_response_hours > 48:
+        score -= 20
+
+    stale_ratio = stale_count / len(issues) if issues else 0
+    score -= stale_ratio * 30
+
+    if avg_resolution_time and avg_resolution_time > 0:
+        resolution_days = avg_resolution_time / (24 * 3600)
+        if resolution_days > 30:
+            score -= 10
+
+    score = max(0, min(100, score))
+
+    if score >= 80:
+        status = 'healthy'
+    elif score >= 50:
+        status = 'moderate'
+    else:
+        status = 'needs_attention'
+
+    return {
+        'health_score': round(score, 1),
+        'status': status,
+        'avg_response_hours': round(avg_response_hours, 1),
+        'stale_issues_count': stale_count
+    }
 
 
 def calculate_issue_health(repo_full_name, open_issues_count, avg_resolution_time, headers, console=None):
     """Calculate issue health score based on response time and stale issues.
 
-    Returns dict with: health_score (0-100), status, avg_response_hours, stale_issues_count.
+    Returns dict with: health_score (0-100), status, avg_response_hours, stale_issues_count;
+    None if the open issues couldn't be fetched (see unknown_issue_health for a placeholder).
     """
     try:
         if open_issues_count == 0:
@@ -91,83 +161,27 @@ def calculate_issue_health(repo_full_name, open_issues_count, avg_resolution_tim
         response = make_github_request(issues_url, headers, params=params, console=console)
 
         if not response or response.status_code != 200:
-            return {
-                'health_score': 50,
-                'status': 'unknown',
-                'avg_response_hours': 0,
-                'stale_issues_count': 0
-            }
+            return None
 
-        issues = response.json()
+        issues = response_json(response)
         if not isinstance(issues, list):
-            return {
-                'health_score': 50,
-                'status': 'unknown',
-                'avg_response_hours': 0,
-                'stale_issues_count': 0
-            }
-
-        now = datetime.datetime.now(datetime.timezone.utc)
-        ninety_days_ago = now - datetime.timedelta(days=90)
-
-        response_times = []
-        stale_count = 0
-
-        for issue in issues:
-            created_at = parse_github_datetime(issue.get('created_at'))
-            updated_at = parse_github_datetime(issue.get('updated_at'))
-
-            if not created_at:
-                continue
-
-            if updated_at and updated_at < ninety_days_ago:
-                stale_count += 1
-
-            if created_at and updated_at and created_at != updated_at:
-                response_time = (updated_at - created_at).total_seconds() / 3600
-                response_times.append(response_time)
-
-        avg_response_hours = sum(response_times) / len(response_times) if response_times else 0
+            return None
 
-        score = 100
-
-        if avg_response_hours > 168:
-            score -= 40
-        elif avg_response_hours > 48:
-            score -= 20
-
-        stale_ratio = stale_count / len(issues) if issues else 0
-        score -= stale_ratio * 30
-
-        if avg_resolution_time and avg_resolution_time > 0:
-            resolution_days = avg_resolution_time / (24 * 3600)
-            if resolution_days > 30:
-                score -= 10
-
-        score = max(0, min(100, score))
-
-        if score >= 80:
-            status = 'healthy'
-        elif score >= 50:
-            status = 'moderate'
-        else:
-            status = 'needs_attention'
-
-        return {
-            'health_score': round(score, 1),
-            'status': status,
-            'avg_response_hours': round(avg_response_hours, 1),
-            'stale_issues_count': stale_count
-        }
+        return score_issue_health(issues, avg_resolution_time)
 
     except Exception as e:
         logging.warning(f"Error calculating issue health for {repo_full_name}: {e}")
-        return {
-            'health_score': 50,
-            'status': 'unknown',
-            'avg_response_hours': 0,
-            'stale_issues_count': 0
-        }
+        return None
+
+
+def unknown_issue_health():
+    """Issue health placeholder for a repository whose open issues couldn't be fetched."""
+    return {
+        'health_score': 50,
+        'status': 'unknown',
+        'avg_response_hours': 0,
+        'stale_issues_count': 0
+    }
 
 
 def calculate_bus_factor(contributors_count):
@@ -203,7 +217,7 @@ def fetch_recent_commits(repo_full_name, headers, console=None, count=5):
         if not response or response.status_code != 200:
             return []
 
-        commits = response.json()
+        commits = response_json(response)
         if not isinstance(commits, list):
             return []
 
@@ -237,7 +251,7 @@ def fetch_top_contributors(repo_full_name, headers, console=None, count=5):
         if not response or response.status_code != 200:
             return []
 
-        contributors = response.json()
+        contributors = response_json(response)
         if not isinstance(contributors, list):
             return []
 
@@ -255,3 +269,16 @@ def fetch_top_contributors(repo_full_name, headers, console=None, count=5):
     except Exception as e:
         logging.warning(f"Error fetching top contributors for {repo_full_name}: {e}")
         return []
+
+
+async def calculate_momentum_score_async(repo_full_name, current_stars, headers, console=None):
+    """Async wrapper around calculate_momentum_score."""
+    return await asyncio.to_thread(calculate_momentum_score, repo_full_name, current_stars, headers, console)
+
+
+async def calculate_issue_health_async(repo_full_name, open_issues_count, avg_resolution_time, headers, console=None):
+    """Async wrapper around calculate_issue_health."""
+    return await asyncio.to_thread(
+        calculate_issue_health, repo_full_name, open_issues_count, avg_resolution_time, headers, console
+    )
+
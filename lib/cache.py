@@ -1,27 +1,232 @@
-"""Disk-backed cache for GitHub API results."""
+"""Disk-backed cache for GitHub API results: one SQLite file of compressed, timestamped entries."""
 
-import datetime
-import json
 import logging
-import os
+import sqlite3
+import threading
+import time
+import zlib
 
-CACHE_FILE = "github_stats_cache.json"
+from lib import codec
+
+CACHE_FILE = "github_stats_cache.sqlite3"
 CACHE_DURATION_HOURS = 1
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+COMPRESSION_LEVEL = 6
 
+RESULT_KEY = "result"
+VALIDATOR_PREFIX = "validator:"
+METRIC_PREFIX = "metric:"
+SNAPSHOT_PREFIX = "repo:"
+# Content-addressed objects (commits by SHA) never change, so they never expire and are never evicted.
+IMMUTABLE_PREFIX = "sha:"
 
-def load_cache():
-    """Load cached data if it exists and is still valid."""
-    try:
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+# Unchanged repositories reuse their previous details for at most this long.
+INCREMENTAL_MAX_AGE_HOURS = 24
+
+# How long each per-repository metric stays valid; unlisted metrics use CACHE_DURATION_HOURS.
+METRIC_TTL_HOURS = {
+    'commits': 6,
+    'contributors': 12,
+    'closed_issues_count': 6,
+    'avg_issue_resolution_time': 6,
+    'language_stats': 24,
+    'version': 24,
+    'momentum': 1,
+    'issue_health': 1,
+}
+
+_store = None
+_store_lock = threading.Lock()
+_metric_cache = None
+_immutable_cache = None
+_MISSING = object()
+
+
+class CacheStore:
+    """Key/value entries in SQLite with zlib-compressed JSON payloads.
+
+    Every entry records when it was written and last read. Once payloads
+    exceed `max_bytes`, the least recently read entries are evicted, except
+    IMMUTABLE_PREFIX entries, which are kept forever. Read times are buffered
+    in memory and written with the next put or close.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        """Return (value, updated_at) for a key, or None when it is absent."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload, updated_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+        return codec.loads(zlib.decompress(row[0])), row[1]
+
+    def put(self, key, value):
+        """Write one entry."""
+        self.put_many({key: value})
+
+    def put_many(self, items):
+        """Write several entries in one transaction, then evict down to the byte cap."""
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            payload = zlib.compress(codec.dumps(value).encode('utf-8'), COMPRESSION_LEVEL)
+            rows.append((key, payload, len(payload), now, now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, payload, size, updated_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key):
+        """Remove an entry if present."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def count(self, prefix=''):
+        """Number of entries whose key starts with `prefix`."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE key >= ? AND key < ?", (prefix, prefix + '\uffff')
+            ).fetchone()[0]
+
+    def total_bytes(self):
+        """Compressed size of all payloads."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched = {}
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        candidates = self._conn.execute(
+            "SELECT key, size FROM entries WHERE key < ? OR key >= ? ORDER BY accessed_at ASC",
+            (IMMUTABLE_PREFIX, IMMUTABLE_PREFIX + '\uffff'),
+        ).fetchall()
+        for key, size in candidates:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        logging.info(f"Cache over {self.max_bytes} bytes; evicted {len(evicted)} least recently used entries.")
+
+    def close(self):
+        """Persist buffered read times and close the database."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+class CacheNamespace:
+    """Dict-like view of the entries under one key prefix; writes are buffered until flush()."""
+
+    def __init__(self, store, prefix):
+        self._store = store
+        self._prefix = prefix
+        self._values = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        with self._lock:
+            if key not in self._values:
+                found = self._store.get(self._prefix + key)
+                self._values[key] = _MISSING if found is None else found[0]
+            return self._values[key]
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._values[key] = value
+            self._dirty.add(key)
 
-            cache_time = datetime.datetime.fromisoformat(cache_data.get('timestamp', ''))
-            now = datetime.datetime.now(datetime.timezone.utc)
+    def __len__(self):
+        with self._lock:
+            pending = len(self._dirty)
+        return self._store.count(self._prefix) + pending
 
-            if (now - cache_time).total_seconds() < CACHE_DURATION_HOURS * 3600:
+    def flush(self):
+        """Write buffered entries to the store; returns how many were written."""
+        with self._lock:
+            items = {self._prefix + key: self._values[key] for key in self._dirty}
+            self._dirty = set()
+        if items:
+            self._store.put_many(items)
+        return len(items)
+
+
+def get_cache_store():
+    """Return the process-wide cache store, opening CACHE_FILE on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CacheStore(CACHE_FILE)
+        return _store
+
+
+def close_cache_store():
+    """Close the process-wide cache store, if open."""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
+
+
+def load_cache(key=RESULT_KEY):
+    """Load cached data if it exists and is still valid."""
+    try:
+        found = get_cache_store().get(key)
+        if found is not None:
+            data, updated_at = found
+            if time.time() - updated_at < CACHE_DURATION_HOURS * 3600:
                 logging.info("Using cached data (still valid)")
-                return cache_data.get('data')
+                return data
 
         logging.info("Cache not found or expired")
         return None
@@ -30,15 +235,249 @@ def load_cache():
         return None
 
 
-def save_cache(data):
+def load_stale_cache(key=RESULT_KEY):
+    """Return (data, age_seconds) for the cached result however old it is, or (None, None)."""
+    try:
+        found = get_cache_store().get(key)
+        if found is not None:
+            data, updated_at = found
+            return data, time.time() - updated_at
+    except Exception as e:
+        logging.warning(f"Error loading stale cache: {e}")
+    return None, None
+
+
+def save_cache(data, key=RESULT_KEY):
     """Save data to cache."""
     try:
-        cache_data = {
-            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            'data': data
-        }
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, indent=2, default=str)
+        get_cache_store().put(key, data)
         logging.info("Data cached successfully")
     except Exception as e:
         logging.warning(f"Error saving cache: {e}")
+
+
+def load_validator_store():
+    """Return the persisted ETag/Last-Modified validators, keyed by request fingerprint and read on demand."""
+    try:
+        store = CacheNamespace(get_cache_store(), VALIDATOR_PREFIX)
+        logging.info(f"{len(store)} conditional-request validators available")
+        return store
+    except Exception as e:
+        logging.warning(f"Error loading validator store: {e}")
+        return {}
+
+
+def save_validator_store(store):
+    """Persist ETag/Last-Modified validators for the next run."""
+    try:
+        if isinstance(store, CacheNamespace):
+            written = store.flush()
+        else:
+            get_cache_store().put_many({VALIDATOR_PREFIX + key: entry for key, entry in (store or {}).items()})
+            written = len(store or {})
+        logging.info(f"Saved {written} conditional-request validators")
+    except Exception as e:
+        logging.warning(f"Error saving validator store: {e}")
+
+
+def load_repository_snapshots():
+    """Previous run's per-repository details with their listing fingerprints, read on demand."""
+    try:
+        return CacheNamespace(get_cache_store(), SNAPSHOT_PREFIX)
+    except Exception as e:
+        logging.warning(f"Error loading repository snapshots: {e}")
+        return {}
+
+
+def save_repository_snapshots(snapshots):
+    """Persist per-repository snapshots for the next run."""
+    try:
+        if isinstance(snapshots, CacheNamespace):
+            written = snapshots.flush()
+        else:
+            get_cache_store().put_many({SNAPSHOT_PREFIX + key: value for key, value in (snapshots or {}).items()})
+            written = len(snapshots or {})
+        logging.info(f"Saved {written} repository snapshots")
+    except Exception as e:
+        logging.warning(f"Error saving repository snapshots: {e}")
+
+
+class MetricCache:
+    """Per-repository, per-metric values, each expiring after its own TTL (METRIC_TTL_HOURS).
+
+    `entries` maps full_name to {metric: {value, fetched_at}}: a plain dict,
+    or a CacheNamespace so that repositories are read from disk on demand.
+    """
+
+    def __init__(self, entries=None, ttl_hours=None):
+        self._entries = entries if entries is not None else {}
+        self.ttl_hours = dict(METRIC_TTL_HOURS, **(ttl_hours or {}))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, entry, metric, now):
+        ttl = self.ttl_hours.get(metric, CACHE_DURATION_HOURS) * 3600
+        return entry is not None and now - entry.get('fetched_at', 0) < ttl
+
+    def lookup(self, full_name, metric):
+        """Return (True, value) for a fresh entry, else (False, None)."""
+        with self._lock:
+            entry = (self._entries.get(full_name) or {}).get(metric)
+            if self._is_fresh(entry, metric, time.time()):
+                self.hits += 1
+                return True, entry['value']
+            self.misses += 1
+            return False, None
+
+    def latest(self, full_name, metric):
+        """Return (True, value) for any stored entry however old, else (False, None); not counted as a hit."""
+        with self._lock:
+            entry = (self._entries.get(full_name) or {}).get(metric)
+        if entry is None:
+            return False, None
+        return True, entry.get('value')
+
+    def is_fresh(self, full_name, metrics):
+        """True when every named metric of a repository is cached and unexpired (not counted as a hit)."""
+        now = time.time()
+        with self._lock:
+            repo_entries = self._entries.get(full_name) or {}
+            return all(self._is_fresh(repo_entries.get(metric), metric, now) for metric in metrics)
+
+    def store(self, full_name, metric, value):
+        """Record a freshly fetched value."""
+        with self._lock:
+            repo_entries = dict(self._entries.get(full_name) or {})
+            repo_entries[metric] = {'value': value, 'fetched_at': time.time()}
+            self._entries[full_name] = repo_entries
+
+    def flush(self):
+        """Write buffered entries to disk when backed by the cache store; returns how many repos were written."""
+        flush = getattr(self._entries, 'flush', None)
+        return flush() if flush else 0
+
+
+def load_metric_cache():
+    """Per-repository metric entries from the cache store; expired ones are kept and simply not served."""
+    try:
+        return MetricCache(CacheNamespace(get_cache_store(), METRIC_PREFIX))
+    except Exception as e:
+        logging.warning(f"Error loading metric cache: {e}")
+    return MetricCache()
+
+
+def save_metric_cache(cache):
+    """Persist per-repository metric entries for the next run."""
+    try:
+        written = cache.flush()
+        logging.info(f"Saved metrics for {written} repositories (hits: {cache.hits}, misses: {cache.misses})")
+    except Exception as e:
+        logging.warning(f"Error saving metric cache: {e}")
+
+
+def enable_metric_cache(cache):
+    """Serve per-repository metrics from `cache` while they are fresh."""
+    global _metric_cache
+    _metric_cache = cache
+
+
+def disable_metric_cache():
+    """Stop using the metric cache; returns it so callers can persist it."""
+    global _metric_cache
+    cache, _metric_cache = _metric_cache, None
+    return cache
+
+
+def get_metric_cache():
+    """Return the active metric cache, or None."""
+    return _metric_cache
+
+
+class MetricUnavailable(Exception):
+    """Raised by a metric fetch that failed when None is a real value; nothing is cached."""
+
+
+def cached_metric(full_name, metric, fetch, cache_none=False):
+    """Return the cached value of a repository metric, or call fetch() and cache its result.
+
+    A fetch returning None has failed and is not cached. Where None is a real
+    answer, set cache_none and have fetch() raise MetricUnavailable on failure;
+    either way a failure returns None.
+    """
+    cache = _metric_cache
+    if cache is not None:
+        found, value = cache.lookup(full_name, metric)
+        if found:
+            return value
+    try:
+        value = fetch()
+    except MetricUnavailable:
+        return None
+    if cache is not None and (value is not None or cache_none):
+        cache.store(full_name, metric, value)
+    return value
+
+
+async def cached_metric_async(full_name, metric, fetch, cache_none=False):
+    """Async variant of cached_metric; fetch() returns an awaitable."""
+    cache = _metric_cache
+    if cache is not None:
+        found, value = cache.lookup(full_name, metric)
+        if found:
+            return value
+    try:
+        value = await fetch()
+    except MetricUnavailable:
+        return None
+    if cache is not None and (value is not None or cache_none):
+        cache.store(full_name, metric, value)
+    return value
+
+
+def load_immutable_cache():
+    """Content-addressed objects from earlier runs, read on demand."""
+    try:
+        return CacheNamespace(get_cache_store(), IMMUTABLE_PREFIX)
+    except Exception as e:
+        logging.warning(f"Error loading immutable object cache: {e}")
+        return {}
+
+
+def save_immutable_cache(cache):
+    """Persist content-addressed objects fetched during this run."""
+    try:
+        written = cache.flush() if isinstance(cache, CacheNamespace) else 0
+        logging.info(f"Saved {written} immutable objects")
+    except Exception as e:
+        logging.warning(f"Error saving immutable object cache: {e}")
+
+
+def enable_immutable_cache(cache):
+    """Serve content-addressed objects (see cached_immutable) from `cache`."""
+    global _immutable_cache
+    _immutable_cache = cache
+
+
+def disable_immutable_cache():
+    """Stop using the immutable object cache; returns it so callers can persist it."""
+    global _immutable_cache
+    cache, _immutable_cache = _immutable_cache, None
+    return cache
+
+
+def cached_immutable(key, fetch):
+    """Return the object stored under a content address such as 'commit/<sha>', or call fetch() and keep its result.
+
+    Only use this for objects that can never change; None (a failed fetch) is not stored.
+    """
+    cache = _immutable_cache
+    if cache is None:
+        return fetch()
+    value = cache.get(key)
+    if value is not None:
+        return value
+    value = fetch()
+    if value is not None:
+        cache[key] = value
+    return value
@@ -0,0 +1,137 @@
+"""Offline record/replay of GitHub API exchanges ("cassettes") for benchmarking without network."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from http.client import responses as http_reasons
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_DIR = "cassettes"
+CASSETTE_MODES = ('off', 'record', 'replay')
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    """Raised in replay mode when no recording exists for a request."""
+
+
+def _request_key(method, url, headers, params, json_data):
+    """Stable digest of the parts of a request that select its response (not auth or validators)."""
+    material = json.dumps({
+        'method': method.upper(),
+        'url': url,
+        'params': sorted((str(k), str(v)) for k, v in (params or {}).items()),
+        'accept': (headers or {}).get('Accept', ''),
+        'json': json_data,
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class CassetteStore:
+    """Directory of recorded exchanges, one JSON file per distinct request.
+
+    latency controls replay delay: None for none, a number of seconds for a
+    fixed delay, or 'recorded' to sleep for the originally measured time.
+    """
+
+    def __init__(self, directory=CASSETTE_DIR, mode='replay', latency=None):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}' (expected one of {', '.join(CASSETTE_MODES)})")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        if mode == 'record':
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def record(self, method, url, headers, params, json_data, response, elapsed):
+        """Save a live response, headers included, under the request's key."""
+        key = _request_key(method, url, headers, params, json_data)
+        entry = {
+            'request': {'method': method, 'url': url, 'params': params, 'accept': (headers or {}).get('Accept', '')},
+            'response': {
+                'status_code': response.status_code,
+                'headers': dict(response.headers),
+                'body': response.text,
+                'url': response.url,
+            },
+            'elapsed': elapsed,
+        }
+        temp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, self._path(key))
+
+    def replay(self, method, url, headers, params, json_data):
+        """Return the recorded response for a request, sleeping for the configured latency."""
+        key = _request_key(method, url, headers, params, json_data)
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise CassetteMiss(f"No cassette recording for {method} {url} params={params}")
+
+        delay = entry.get('elapsed', 0.0) if self.latency == 'recorded' else (self.latency or 0.0)
+        if delay:
+            time.sleep(delay)
+
+        recorded = entry['response']
+        response = requests.Response()
+        response.status_code = recorded['status_code']
+        response.reason = http_reasons.get(response.status_code, '')
+        response.headers = CaseInsensitiveDict(recorded.get('headers') or {})
+        response._content = (recorded.get('body') or '').encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = recorded.get('url') or url
+        response.request = requests.Request(method, url, params=params).prepare()
+        return response
+
+
+_cassette = None
+_configured = False
+_config_lock = threading.Lock()
+
+
+def configure_cassette(mode='off', directory=CASSETTE_DIR, latency=None):
+    """Switch the process-wide cassette mode; 'off' talks to GitHub directly."""
+    global _cassette, _configured
+    with _config_lock:
+        _cassette = None if mode == 'off' else CassetteStore(directory, mode, latency)
+        _configured = True
+    if _cassette:
+        logging.info(f"Cassette {mode} mode using {directory}.")
+    return _cassette
+
+
+def _latency_from_env(value):
+    if not value:
+        return None
+    if value == 'recorded':
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        logging.warning(f"Ignoring invalid GITHUB_CASSETTE_LATENCY '{value}'.")
+        return None
+
+
+def get_cassette():
+    """Return the active cassette store, configuring it from the environment on first use.
+
+    GITHUB_CASSETTE_MODE=record|replay, GITHUB_CASSETTE_DIR and
+    GITHUB_CASSETTE_LATENCY (seconds or 'recorded') apply to every script
+    that goes through make_github_request.
+    """
+    if not _configured:
+        configure_cassette(
+            os.environ.get('GITHUB_CASSETTE_MODE', 'off') or 'off',
+            os.environ.get('GITHUB_CASSETTE_DIR', CASSETTE_DIR),
+            _latency_from_env(os.environ.get('GITHUB_CASSETTE_LATENCY')),
+        )
+    return _cassette
@@ -0,0 +1,98 @@
+"""Append-only JSONL checkpoint of finished repositories, so an interrupted run can resume."""
+
+import logging
+import os
+import threading
+import time
+
+from lib import codec
+
+CHECKPOINT_FILE = "github_stats_checkpoint.jsonl"
+
+_checkpoint = None
+
+
+class Checkpoint:
+    """One JSON line per finished repository, flushed as soon as it is written.
+
+    A run killed mid-write leaves at most one truncated last line, which
+    load_checkpoint() ignores.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE, resume=False):
+        self.path = path
+        self.written = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def append(self, repo_info, fingerprint=None, checkpointed_at=None):
+        """Write one repository's current fields, with its listing fingerprint and when its details were fetched.
+
+        checkpointed_at defaults to now; details carried forward from an
+        earlier run keep their original time so they still age out.
+        """
+        if checkpointed_at is None:
+            checkpointed_at = time.time()
+        line = codec.dumps(dict(repo_info, fingerprint=fingerprint, checkpointed_at=checkpointed_at)) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.written += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def discard(self):
+        """Close and delete the checkpoint once the run it protects has completed."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    """Return {full_name: repo fields} from a checkpoint; later lines win, unreadable lines are skipped."""
+    entries = {}
+    try:
+        with open(path, 'rb') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    repo_info = codec.loads(line)
+                except codec.JSONDecodeError:
+                    logging.warning(f"Ignoring unreadable checkpoint line {number} in {path}")
+                    continue
+                if isinstance(repo_info, dict) and repo_info.get('full_name'):
+                    entries[repo_info['full_name']] = repo_info
+    except FileNotFoundError:
+        logging.info(f"No checkpoint at {path}; starting from scratch")
+    except Exception as e:
+        logging.warning(f"Error loading checkpoint {path}: {e}")
+    return entries
+
+
+def enable_checkpoint(checkpoint):
+    """Append every repository finished from now on to `checkpoint`."""
+    global _checkpoint
+    _checkpoint = checkpoint
+
+
+def disable_checkpoint():
+    """Stop checkpointing; returns the checkpoint so callers can close or discard it."""
+    global _checkpoint
+    checkpoint, _checkpoint = _checkpoint, None
+    return checkpoint
+
+
+def checkpoint_repository(repo_info, fingerprint=None, checkpointed_at=None):
+    """Append a finished repository and its listing fingerprint to the active checkpoint, if any."""
+    checkpoint = _checkpoint
+    if checkpoint is None:
+        return
+    try:
+        checkpoint.append(repo_info, fingerprint, checkpointed_at)
+    except Exception as e:
+        logging.warning(f"Error writing checkpoint for {repo_info.get('full_name')}: {e}")
@@ -0,0 +1,66 @@
+"""JSON codec: orjson when it is installed, the standard library otherwise."""
+
+import datetime
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both codecs.
+JSONDecodeError = json.JSONDecodeError
+
+
+def _fallback_default(o):
+    """Serialize what JSON has no type for: datetimes as ISO 8601, anything else as str()."""
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    return str(o)
+
+
+def _double_indent(data):
+    """Turn orjson's two-space indentation into four spaces.
+
+    JSON strings cannot hold raw newlines, so a line's leading spaces are only ever indentation.
+    """
+    return b'\n'.join([b' ' * (len(line) - len(line.lstrip(b' '))) + line for line in data.split(b'\n')])
+
+
+def loads(data):
+    """Decode JSON from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent=False, default=_fallback_default):
+    """Encode to a JSON str; indent=True pretty-prints with four spaces, like json.dumps(indent=4).
+
+    orjson can only indent by two, so its pretty output has every line's
+    indentation doubled.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        data = orjson.dumps(obj, default=default, option=option)
+        if indent:
+            data = _double_indent(data)
+        return data.decode('utf-8')
+    if indent:
+        return json.dumps(obj, indent=4, default=default, ensure_ascii=False)
+    return json.dumps(obj, separators=(',', ':'), default=default, ensure_ascii=False)
+
+
+def load(f):
+    """Decode JSON from an open file."""
+    return loads(f.read())
+
+
+def dump(obj, f, indent=False, default=_fallback_default):
+    """Encode obj as JSON into an open text file."""
+    f.write(dumps(obj, indent=indent, default=default))
+
+
+def response_json(response):
+    """Decode a requests response body, skipping requests' charset detection and stdlib json."""
+    return loads(response.content)
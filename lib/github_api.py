@@ -1,10 +1,28 @@
-"""HTTP client for the GitHub REST API with retries, backoff, and rate-limit awareness."""
+"""HTTP client for the GitHub REST API with pooled connections, retries, backoff, and rate-limit awareness."""
 
+import asyncio
 import logging
+import threading
 import time
-from urllib.parse import parse_qs, urlparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import parse_qs, parse_qsl, urlparse, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from lib.cassette import CassetteMiss, get_cassette
+from lib.latency import LatencyEstimator
+from lib.rate_limit import (
+    configure_concurrency,
+    get_concurrency_limiter,
+    get_token_pool,
+    is_secondary_rate_limit,
+    mask_token,
+    resource_for_url,
+    select_token,
+)
+from lib.telemetry import get_request_metrics
 
 GITHUB_API_BASE_URL = "https://api.github.com"
 REQUEST_TIMEOUT = 15
@@ -12,34 +30,405 @@ DEFAULT_PAGE_SIZE = 100
 MAX_RETRIES = 5
 INITIAL_RETRY_DELAY = 1
 MAX_RETRY_DELAY = 60
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+PAGINATION_WORKERS = 4
+SECONDARY_LIMIT_DELAY = 60
+MAX_SECONDARY_LIMIT_DELAY = 300
+MAX_SECONDARY_LIMIT_REQUEUES = 5
+
+VALIDATOR_HEADERS = ('Content-Type', 'Link')
+
+_session = None
+_session_lock = threading.Lock()
+_validator_store = None
+_response_memo = None
+_memo_lock = threading.Lock()
+_inflight_requests = {}
+_memo_counters = {'hits': 0, 'coalesced': 0, 'misses': 0}
+_resource_counts = {}
+_latency = LatencyEstimator(REQUEST_TIMEOUT)
+_hedging_enabled = False
+_hedge_pool = None
+
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    """Build a keep-alive session with a pooled transport adapter and gzip negotiation."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+    return session
+
+
+def get_session():
+    """Return the process-wide HTTP session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def configure_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    """Replace the shared session with one sized for the given pool settings."""
+    global _session
+    with _session_lock:
+        previous = _session
+        _session = create_session(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    if previous is not None:
+        previous.close()
+    logging.info(f"HTTP session configured (pool_connections={pool_connections}, pool_maxsize={pool_maxsize}).")
+    return _session
+
+
+def close_session():
+    """Close the shared session and release its pooled connections."""
+    global _session
+    with _session_lock:
+        previous = _session
+        _session = None
+    if previous is not None:
+        previous.close()
+
+
+def set_max_concurrent_requests(limit):
+    """Cap the number of requests in flight at once across all threads and tasks.
+
+    The cap is the ceiling of an AIMD limiter: secondary rate limits halve the
+    in-flight allowance and successes grow it back towards `limit`.
+    """
+    limiter = configure_concurrency(limit)
+    _reset_hedge_pool()
+    logging.info(f"Max concurrent GitHub requests set to {limiter.max_limit}.")
+
+
+def enable_conditional_requests(store):
+    """Send stored ETag/Last-Modified validators and serve cached bodies on 304 Not Modified."""
+    global _validator_store
+    _validator_store = store if store is not None else {}
+    return _validator_store
+
+
+def disable_conditional_requests():
+    """Stop sending validators; returns the store so callers can persist it."""
+    global _validator_store
+    store, _validator_store = _validator_store, None
+    return store
+
+
+def get_validator_store():
+    """Return the active validator store, or None when conditional requests are off."""
+    return _validator_store
+
+
+def get_latency_estimator():
+    """Return the per-endpoint latency estimator behind adaptive timeouts and hedging."""
+    return _latency
+
+
+def enable_hedging(enabled=True):
+    """Send a duplicate of plain GETs that run past their endpoint's p95; the first answer wins."""
+    global _hedging_enabled
+    _hedging_enabled = enabled
+
+
+def _get_hedge_pool():
+    """Pool for hedged GETs, two threads per request the limiter allows in flight so none ever queue."""
+    global _hedge_pool
+    with _session_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=2 * get_concurrency_limiter().max_limit,
+                                             thread_name_prefix="github-hedge")
+        return _hedge_pool
+
+
+def _reset_hedge_pool():
+    """Drop the hedge pool so the next hedged GET builds one sized for the current limiter."""
+    global _hedge_pool
+    with _session_lock:
+        pool, _hedge_pool = _hedge_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _close_response(future):
+    """Done-callback that releases the connection held by a losing hedge."""
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        future.result().close()
+
+
+def _send_hedge(url, request_headers, params, timeout, scheduler, resource, primary):
+    """Send the duplicate under the same pacing and in-flight cap as any request.
+
+    Returns None instead when the limiter has no free slot or the primary
+    answered meanwhile; a hedge never waits for a slot. The slot it takes is
+    held until the primary has finished too, since the caller gives back the
+    primary's own slot as soon as either answer arrives.
+    """
+    scheduler.acquire(resource)
+    limiter = get_concurrency_limiter()
+    if primary.done() or limiter.try_acquire() is None:
+        scheduler.release(resource)
+        return None
+    response = None
+    try:
+        response = get_session().request('GET', url, headers=request_headers, params=params, timeout=timeout)
+        return response
+    finally:
+        primary.add_done_callback(lambda _: limiter.release())
+        scheduler.release(resource, response.headers if response is not None else None)
+
+
+def _hedged_get(url, request_headers, params, timeout, hedge_after, scheduler, resource):
+    """GET with a duplicate sent after `hedge_after` seconds; returns whichever answers first.
+
+    The primary runs on the hedge pool rather than the calling thread, since a
+    thread blocked in a socket read could not hand back the duplicate's answer
+    early. The duplicate goes through `scheduler` and the concurrency limiter
+    like any other request.
+    """
+    pool = _get_hedge_pool()
+    primary = pool.submit(get_session().request, 'GET', url, headers=request_headers, params=params, timeout=timeout)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    logging.debug(f"Hedging {url} after {hedge_after:.2f}s.")
+    _latency.record_hedge()
+    get_request_metrics().record_hedge(url)
+    pending = {primary, pool.submit(_send_hedge, url, request_headers, params, timeout, scheduler, resource, primary)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winners = [future for future in done if future.exception() is None and future.result() is not None]
+        if winners:
+            for future in winners[1:]:
+                future.result().close()
+            for future in pending:
+                future.add_done_callback(_close_response)
+            return winners[0].result()
+        error = next((future.exception() for future in done if future.exception() is not None), error)
+    raise error
+
+
+def _request_fingerprint(url, headers, params):
+    """Fingerprint a GET by normalized URL, sorted query params (inline and passed) and Accept header."""
+    parts = urlsplit(url)
+    query_items = parse_qsl(parts.query, keep_blank_values=True)
+    query_items.extend((str(k), str(v)) for k, v in (params or {}).items())
+    query = "&".join(f"{k}={v}" for k, v in sorted(query_items))
+    path = parts.path.rstrip('/') or '/'
+    accept = (headers or {}).get('Accept', '')
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}?{query}|{accept}"
+
+
+def enable_response_memo():
+    """Memoize GET responses for the rest of the run and coalesce concurrent identical requests."""
+    global _response_memo
+    with _memo_lock:
+        _response_memo = {}
+        _resource_counts.clear()
+        for counter in _memo_counters:
+            _memo_counters[counter] = 0
+
+
+def disable_response_memo():
+    """Drop memoized responses; returns the hit/coalesced/miss counters for the run."""
+    global _response_memo
+    with _memo_lock:
+        _response_memo = None
+        _resource_counts.clear()
+        return dict(_memo_counters)
+
+
+class _Flight:
+    """A GET in progress that identical concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
 
 
-def make_github_request(url, headers, params=None, console=None, retries=MAX_RETRIES):
-    """Make a request to the GitHub API with error handling, rate-limit awareness, and retries."""
+def _apply_validators(key, headers):
+    """Return a copy of headers carrying If-None-Match/If-Modified-Since for a stored entry."""
+    entry = _validator_store.get(key)
+    if not entry:
+        return headers
+    conditional_headers = dict(headers or {})
+    if entry.get('etag'):
+        conditional_headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        conditional_headers['If-Modified-Since'] = entry['last_modified']
+    return conditional_headers
+
+
+def _store_validators(key, response):
+    """Remember validators and body of a 200 response that carries ETag or Last-Modified."""
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if response.status_code != 200 or not (etag or last_modified):
+        return
+    _validator_store[key] = {
+        'etag': etag,
+        'last_modified': last_modified,
+        'body': response.text,
+        'headers': {name: response.headers[name] for name in VALIDATOR_HEADERS if name in response.headers},
+    }
+
+
+def _response_from_validators(key, not_modified):
+    """Rebuild a 200 response from the stored body for a 304 Not Modified answer."""
+    entry = _validator_store[key]
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.headers = CaseInsensitiveDict(not_modified.headers)
+    response.headers.update(entry.get('headers') or {})
+    response._content = entry.get('body', '').encode('utf-8')
+    response.encoding = 'utf-8'
+    response.url = not_modified.url
+    response.request = not_modified.request
+    return response
+
+
+def _transport(method, url, headers, request_headers, params, json_data, scheduler=None, resource=None):
+    """Send over the pooled session, or through the cassette when record/replay is active.
+
+    `scheduler` and `resource` pace the duplicate of a hedged GET.
+    """
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == 'replay':
+        return cassette.replay(method, url, headers, params, json_data)
+    timeout = _latency.timeouts(url)
+    hedge_after = None
+    if _hedging_enabled and method == 'GET' and cassette is None and scheduler is not None:
+        hedge_after = _latency.hedge_delay(url)
+    started = time.monotonic()
+    if hedge_after is not None:
+        response = _hedged_get(url, request_headers, params, timeout, hedge_after, scheduler, resource)
+    else:
+        response = get_session().request(
+            method, url, headers=request_headers, params=params, json=json_data, timeout=timeout
+        )
+    if cassette is not None:
+        cassette.record(method, url, headers, params, json_data, response, time.monotonic() - started)
+    return response
+
+
+def make_github_request(url, headers, params=None, console=None, retries=MAX_RETRIES, method='GET', json_data=None,
+                        not_found_ok=False):
+    """Make a request to the GitHub API with error handling, rate-limit awareness, and retries.
+
+    GET is the default; pass method='POST' and json_data for GraphQL queries, or method='HEAD'
+    for headers only. While the response memo is enabled, each distinct GET is sent at most once per run.
+    A 409 Conflict (empty repository) is returned as-is rather than retried, as is a 404
+    when not_found_ok is set; otherwise a 404 returns None like any other failure.
+    """
+    if _response_memo is None or method != 'GET':
+        return _send_github_request(url, headers, params, console, retries, method, json_data, not_found_ok)
+
+    key = _request_fingerprint(url, headers, params) + ('|404' if not_found_ok else '')
+    with _memo_lock:
+        if _response_memo is not None and key in _response_memo:
+            _memo_counters['hits'] += 1
+            return _response_memo[key]
+        flight = _inflight_requests.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight_requests[key] = _Flight()
+            _memo_counters['misses'] += 1
+        else:
+            _memo_counters['coalesced'] += 1
+
+    if not leader:
+        flight.done.wait()
+        return flight.response
+
+    try:
+        flight.response = _send_github_request(url, headers, params, console, retries, method, json_data,
+                                               not_found_ok=not_found_ok)
+        with _memo_lock:
+            if flight.response is not None and _response_memo is not None:
+                _response_memo[key] = flight.response
+    finally:
+        with _memo_lock:
+            _inflight_requests.pop(key, None)
+        flight.done.set()
+    return flight.response
+
+
+def _send_github_request(url, headers, params, console, retries, method, json_data, not_found_ok=False):
+    """Send one logical request with rate-limit pacing, token selection, validators and retries."""
     current_retry = 0
     delay = INITIAL_RETRY_DELAY
+    requeues = 0
+    # Cassettes hold full bodies, so validators (and the 304s they cause) stay out of record/replay runs.
+    conditional = _validator_store is not None and method in ('GET', 'HEAD') and get_cassette() is None
+    validator_key = _request_fingerprint(url, headers, params) if conditional else None
+    if validator_key and method == 'HEAD':
+        validator_key += '|head'
+    resource = resource_for_url(url)
+    metrics = get_request_metrics()
     while current_retry <= retries:
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+            request_headers = _apply_validators(validator_key, headers) if validator_key else headers
+            token, scheduler = select_token(resource)
+            if token:
+                request_headers = dict(request_headers or {})
+                request_headers['Authorization'] = f'token {token}'
+            metrics.record_pacing(url, scheduler.acquire(resource))
+            limiter = get_concurrency_limiter()
+            response = None
+            epoch = limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = _transport(method, url, headers, request_headers, params, json_data, scheduler, resource)
+            finally:
+                limiter.release()
+                elapsed = time.monotonic() - started
+                scheduler.release(resource, response.headers if response is not None else None)
+                if response is not None:
+                    metrics.record_response(url, elapsed, response)
+                    if response.status_code < 500:
+                        _latency.observe(url, elapsed)
+                else:
+                    metrics.record_failure(url, elapsed)
 
-            remaining_requests = response.headers.get('X-RateLimit-Remaining')
-            if remaining_requests is not None:
-                try:
-                    if int(remaining_requests) < 10:
-                        logging.warning(f"Low rate limit remaining ({remaining_requests}). Adding small delay.")
-                        time.sleep(0.5)
-                except ValueError:
-                    pass
+            secondary_limit = is_secondary_rate_limit(response)
+            if secondary_limit:
+                limiter.on_throttle(epoch)
+            elif response.status_code < 400:
+                limiter.on_success(epoch)
 
-            if response.status_code == 403 and "Retry-After" in response.headers:
+            if (response.status_code in (403, 429) and "Retry-After" not in response.headers
+                    and response.headers.get('X-RateLimit-Remaining') == '0'):
+                metrics.record_retry(url, 0)
+                if token and get_token_pool().has_quota(resource, exclude=token):
+                    logging.warning(f"Rate limit exhausted for {url} on token {mask_token(token)}. Switching tokens.")
+                    continue
+                current_retry += 1
+                logging.warning(f"Rate limit exhausted for {url}. Waiting for reset before retrying ({current_retry}/{retries}).")
+                if console:
+                    console.print("[yellow]Rate limit exhausted. Waiting for reset...[/yellow]")
+                continue
+
+            if response.status_code in (403, 429) and "Retry-After" in response.headers:
                 try:
                     retry_after = int(response.headers["Retry-After"])
+                    if token and get_token_pool().has_quota(resource, exclude=token):
+                        metrics.record_retry(url, 0)
+                        scheduler.mark_exhausted(resource, retry_after)
+                        logging.warning(f"Rate limit hit for {url} on token {mask_token(token)}. Switching tokens.")
+                        continue
                     wait_time = max(retry_after, delay)
                     wait_time = min(wait_time, 300)
                     logging.warning(f"Rate limit hit for {url}. Retrying after {wait_time} seconds.")
                     if console:
                         console.print(f"[yellow]Rate limit hit. Waiting {wait_time}s...[/yellow]", end=" ")
                     time.sleep(wait_time)
+                    metrics.record_retry(url, wait_time)
                     if console:
                         console.print("[yellow]Resuming.[/yellow]")
                     delay = INITIAL_RETRY_DELAY
@@ -47,15 +436,43 @@ def make_github_request(url, headers, params=None, console=None, retries=MAX_RET
                 except ValueError:
                     logging.warning(f"Rate limit hit for {url}, but couldn't parse Retry-After header: {response.headers['Retry-After']}. Falling back to exponential backoff.")
 
+            if secondary_limit and "Retry-After" not in response.headers:
+                # Concurrency was just lowered; put this request back in line instead of dropping it.
+                requeues += 1
+                if requeues > MAX_SECONDARY_LIMIT_REQUEUES:
+                    logging.error(f"Secondary rate limit persisted for {url} after {MAX_SECONDARY_LIMIT_REQUEUES} requeues.")
+                    return None
+                wait_time = min(SECONDARY_LIMIT_DELAY * 2 ** (requeues - 1), MAX_SECONDARY_LIMIT_DELAY)
+                logging.warning(f"Secondary rate limit for {url}. Requeueing in {wait_time}s ({requeues}/{MAX_SECONDARY_LIMIT_REQUEUES}).")
+                if console:
+                    console.print(f"[yellow]Secondary rate limit. Waiting {wait_time}s...[/yellow]")
+                time.sleep(wait_time)
+                metrics.record_retry(url, wait_time)
+                continue
+
+            if response.status_code == 304 and validator_key and validator_key in _validator_store:
+                logging.debug(f"Not modified (304) for {url}; serving stored body.")
+                return _response_from_validators(validator_key, response)
+
             response.raise_for_status()
+            if validator_key:
+                _store_validators(validator_key, response)
             return response
 
+        except CassetteMiss as e:
+            logging.error(f"{e}. Re-record the cassette to include it.")
+            return None
         except requests.exceptions.Timeout as e:
             logging.warning(f"Request timed out for {url} (Attempt {current_retry+1}/{retries+1}): {e}")
         except requests.exceptions.RequestException as e:
             status_code = getattr(getattr(e, 'response', None), 'status_code', None)
             logging.error(f"Request failed for {url} (Attempt {current_retry+1}/{retries+1}, Status: {status_code}): {e}")
 
+            if status_code == 409:
+                logging.info(f"Conflict (409) at {url}; the repository is likely empty. Not retrying.")
+                return e.response
+            if status_code == 404 and not_found_ok:
+                return e.response
             if status_code == 404:
                 logging.warning(f"Resource not found (404) at {url}. Aborting retries for this request.")
                 return None
@@ -78,6 +495,7 @@ def make_github_request(url, headers, params=None, console=None, retries=MAX_RET
                 error_type = type(e).__name__ if 'e' in locals() else 'Unknown Error'
                 console.print(f"[yellow]Request failed ({error_type}). Retrying in {actual_delay}s...[/yellow]", end=" ")
             time.sleep(actual_delay)
+            metrics.record_retry(url, actual_delay)
             if console:
                 console.print("[yellow]Retrying.[/yellow]")
             delay *= 2
@@ -90,6 +508,107 @@ def make_github_request(url, headers, params=None, console=None, retries=MAX_RET
     return None
 
 
+async def make_github_request_async(url, headers, params=None, console=None, retries=MAX_RETRIES):
+    """Async variant of make_github_request; runs the pooled client in a worker thread."""
+    return await asyncio.to_thread(make_github_request, url, headers, params, console, retries)
+
+
+def _page_number(link_url):
+    """Extract the `page` query parameter from a Link URL, or None."""
+    if not link_url:
+        return None
+    try:
+        return int(parse_qs(urlparse(link_url).query)['page'][0])
+    except (KeyError, IndexError, ValueError, TypeError):
+        return None
+
+
+def iter_github_pages(url, headers, params=None, console=None, max_workers=PAGINATION_WORKERS):
+    """Yield each page's response in order, stopping after the first failed page (yielded as None).
+
+    The first page's Link header is parsed once. When it names a numbered
+    rel="last" page, the remaining pages are fetched concurrently (still paced
+    by the rate-limit scheduler and the in-flight cap); otherwise rel="next"
+    links are followed one at a time.
+    """
+    params = dict(params or {})
+    first_page = int(params.get('page', 1))
+    params['page'] = first_page
+    response = make_github_request(url, headers, params=params, console=console)
+    yield response
+    if response is None:
+        return
+
+    last_page = _page_number(response.links.get('last', {}).get('url'))
+    if last_page is not None and last_page > first_page and max_workers > 1:
+        logging.debug(f"Fetching pages {first_page + 1}-{last_page} of {url} with {max_workers} workers.")
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="github-pages")
+        try:
+            futures = [
+                pool.submit(make_github_request, url, headers, {**params, 'page': page}, console)
+                for page in range(first_page + 1, last_page + 1)
+            ]
+            for future in futures:
+                page_response = future.result()
+                yield page_response
+                if page_response is None:
+                    return
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return
+
+    next_url = response.links.get('next', {}).get('url')
+    while next_url:
+        response = make_github_request(next_url, headers, console=console)
+        yield response
+        if response is None:
+            return
+        next_url = response.links.get('next', {}).get('url')
+
+
+def get_resource_count(url, headers, params=None, console=None):
+    """Count the items of a list endpoint from its Link header alone, cached while the response memo is on.
+
+    The probe is a HEAD request for per_page=1 and reads rel="last" from
+    response.links, so no body is transferred. Without a Link header (zero or
+    one item) the single-item page is fetched and counted. Returns None when
+    a request fails; 204 and 409 count as 0.
+    """
+    params = {**(params or {}), 'per_page': 1}
+    key = _request_fingerprint(url, headers, params)
+    with _memo_lock:
+        if _response_memo is not None and key in _resource_counts:
+            return _resource_counts[key]
+
+    response = make_github_request(url, headers, params=params, console=console, method='HEAD')
+    if response is None:
+        return None
+
+    last_page = _page_number(response.links.get('last', {}).get('url'))
+    if last_page is not None:
+        count = last_page
+    elif response.status_code in (204, 409):
+        count = 0
+    elif response.status_code == 200:
+        response = make_github_request(url, headers, params=params, console=console)
+        if response is None:
+            return None
+        try:
+            items = response.json()
+            count = len(items) if isinstance(items, list) else 0
+        except (ValueError, TypeError):
+            logging.warning(f"Could not decode single-page body for count probe at {url}.")
+            count = 0
+    else:
+        logging.warning(f"Could not determine item count at {url}. Status: {response.status_code}")
+        count = 0
+
+    with _memo_lock:
+        if _response_memo is not None:
+            _resource_counts[key] = count
+    return count
+
+
 def get_count_from_link_header(response):
     """Estimate total item count from the Link header's 'last' relation (per_page=1 only)."""
     if not response or 'Link' not in response.headers:
@@ -0,0 +1,186 @@
+"""GraphQL batch backend: per-repo detail fields for many repositories in one query."""
+
+import logging
+
+from lib.advanced_metrics import score_issue_health, score_momentum
+from lib.codec import JSONDecodeError, response_json
+from lib.github_api import make_github_request
+from lib.repo_metrics import (
+    empty_version_info,
+    release_version_info,
+    summarize_language_bytes,
+    tag_version_info,
+)
+from lib.utils import parse_github_datetime
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 25
+OPEN_ISSUES_SAMPLE = 30
+STARGAZERS_SAMPLE = 100
+
+REPOSITORY_FRAGMENT = f"""
+fragment RepoDetails on Repository {{
+  defaultBranchRef {{
+    target {{
+      ... on Commit {{ history {{ totalCount }} }}
+    }}
+  }}
+  closedIssues: issues(states: CLOSED) {{ totalCount }}
+  closedPullRequests: pullRequests(states: [CLOSED, MERGED]) {{ totalCount }}
+  languages(first: 100, orderBy: {{field: SIZE, direction: DESC}}) {{
+    edges {{ size node {{ name }} }}
+  }}
+  latestRelease {{ tagName name url publishedAt description }}
+  refs(refPrefix: "refs/tags/", first: 1, orderBy: {{field: TAG_COMMIT_DATE, direction: DESC}}) {{
+    nodes {{
+      name
+      target {{
+        ... on Commit {{ committedDate message }}
+        ... on Tag {{ target {{ ... on Commit {{ committedDate message }} }} }}
+      }}
+    }}
+  }}
+  openIssues: issues(states: OPEN, first: {OPEN_ISSUES_SAMPLE}, orderBy: {{field: CREATED_AT, direction: DESC}}) {{
+    nodes {{ createdAt updatedAt }}
+  }}
+  stargazers(last: {STARGAZERS_SAMPLE}, orderBy: {{field: STARRED_AT, direction: ASC}}) {{
+    edges {{ starredAt }}
+  }}
+}}
+"""
+
+
+def build_repository_batch_query(full_names):
+    """Build an aliased query (r0, r1, ...) and its variables for a list of owner/name strings."""
+    declarations = []
+    selections = []
+    variables = {}
+    for index, full_name in enumerate(full_names):
+        owner, name = full_name.split('/', 1)
+        declarations.append(f"$o{index}: String!, $n{index}: String!")
+        selections.append(f"  r{index}: repository(owner: $o{index}, name: $n{index}) {{ ...RepoDetails }}")
+        variables[f"o{index}"] = owner
+        variables[f"n{index}"] = name
+
+    query = (
+        f"query RepoBatch({', '.join(declarations)}) {{\n"
+        + "\n".join(selections)
+        + "\n}\n"
+        + REPOSITORY_FRAGMENT
+    )
+    return query, variables
+
+
+def fetch_repository_nodes(full_names, headers, console=None):
+    """Run one batch query; returns {full_name: node or None}, or None if the request failed."""
+    query, variables = build_repository_batch_query(full_names)
+    graphql_headers = {key: value for key, value in headers.items() if key != 'Accept'}
+    response = make_github_request(
+        GITHUB_GRAPHQL_URL, graphql_headers, console=console,
+        method='POST', json_data={'query': query, 'variables': variables},
+    )
+    if response is None:
+        return None
+
+    try:
+        payload = response_json(response)
+    except JSONDecodeError:
+        logging.error(f"Failed to decode GraphQL response for batch of {len(full_names)} repositories.")
+        return None
+
+    for error in payload.get('errors') or []:
+        logging.warning(f"GraphQL error ({error.get('type', 'unknown')}): {error.get('message')}")
+
+    data = payload.get('data') or {}
+    return {full_name: data.get(f"r{index}") for index, full_name in enumerate(full_names)}
+
+
+def _tag_commit(target):
+    """Resolve a tag ref target (lightweight -> Commit, annotated -> Tag -> Commit) to its commit."""
+    if not target:
+        return {}
+    if 'committedDate' in target:
+        return target
+    return target.get('target') or {}
+
+
+def parse_repository_node(full_name, node, current_stars):
+    """Map one GraphQL repository node to the metric values the REST fetchers produce."""
+    history = ((node.get('defaultBranchRef') or {}).get('target') or {}).get('history') or {}
+    commits = history.get('totalCount', 0)
+
+    # REST's /issues?state=closed counts pull requests too; keep the same meaning.
+    closed_issues_count = (
+        (node.get('closedIssues') or {}).get('totalCount', 0)
+        + (node.get('closedPullRequests') or {}).get('totalCount', 0)
+    )
+
+    language_bytes = {
+        edge['node']['name']: edge['size']
+        for edge in (node.get('languages') or {}).get('edges') or []
+        if edge.get('node')
+    }
+
+    release = node.get('latestRelease')
+    tag_nodes = (node.get('refs') or {}).get('nodes') or []
+    if release:
+        version_info = release_version_info(
+            full_name,
+            release.get('tagName') or release.get('name') or 'unknown',
+            release.get('url'),
+            parse_github_datetime(release.get('publishedAt')),
+            release.get('name'),
+            release.get('description'),
+        )
+    elif tag_nodes:
+        tag = tag_nodes[0]
+        commit = _tag_commit(tag.get('target'))
+        version_info = tag_version_info(
+            full_name,
+            tag.get('name') or 'unknown',
+            parse_github_datetime(commit.get('committedDate')),
+            commit.get('message'),
+        )
+    else:
+        version_info = empty_version_info()
+
+    open_issues = [
+        {'created_at': issue.get('createdAt'), 'updated_at': issue.get('updatedAt')}
+        for issue in (node.get('openIssues') or {}).get('nodes') or []
+    ]
+    starred_at_values = [edge.get('starredAt') for edge in (node.get('stargazers') or {}).get('edges') or []]
+
+    return {
+        'commits': commits,
+        'closed_issues_count': closed_issues_count,
+        'language_stats': summarize_language_bytes(language_bytes),
+        'version_info': version_info,
+        'open_issues': open_issues,
+        'momentum': score_momentum(starred_at_values, current_stars),
+    }
+
+
+def issue_health_from_node(parsed, open_issues_count, avg_resolution_time):
+    """Issue health from a parsed node, matching calculate_issue_health's shortcut for zero open issues."""
+    if open_issues_count == 0:
+        return {
+            'health_score': 100,
+            'status': 'healthy',
+            'avg_response_hours': 0,
+            'stale_issues_count': 0
+        }
+    return score_issue_health(parsed['open_issues'], avg_resolution_time)
+
+
+def fetch_repository_details_batches(full_names, headers, console=None, batch_size=GRAPHQL_BATCH_SIZE,
+                                     should_stop=None):
+    """Yield (batch, nodes) for consecutive slices of full_names; nodes is None on request failure.
+
+    No further query is sent once should_stop() returns true.
+    """
+    for start in range(0, len(full_names), batch_size):
+        if should_stop is not None and should_stop():
+            return
+        batch = full_names[start:start + batch_size]
+        logging.info(f"GraphQL batch {start // batch_size + 1}: {len(batch)} repositories.")
+        yield batch, fetch_repository_nodes(batch, headers, console)
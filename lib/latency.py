@@ -0,0 +1,88 @@
+"""Per-endpoint latency estimates used for adaptive timeouts and hedged GETs."""
+
+import math
+import threading
+from collections import deque
+
+from lib.telemetry import endpoint_template
+
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 10
+HEDGE_QUANTILE = 0.95
+HEDGE_BUDGET_FRACTION = 0.05
+CONNECT_TIMEOUT = 5
+MIN_CONNECT_TIMEOUT = 2
+MIN_READ_TIMEOUT = 5
+MAX_READ_TIMEOUT = 60
+READ_TIMEOUT_FACTOR = 4
+
+
+class LatencyEstimator:
+    """Sliding window of recent latencies per endpoint template.
+
+    Until an endpoint has MIN_LATENCY_SAMPLES observations the defaults apply:
+    `default_timeout` for reads and no hedging.
+    """
+
+    def __init__(self, default_timeout, window=LATENCY_WINDOW, min_samples=MIN_LATENCY_SAMPLES):
+        self.default_timeout = default_timeout
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._requests = 0
+        self._hedges = 0
+
+    def observe(self, url, seconds):
+        """Record how long a successful request to `url` took."""
+        template = endpoint_template(url)
+        with self._lock:
+            samples = self._samples.get(template)
+            if samples is None:
+                samples = self._samples[template] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._requests += 1
+
+    def quantile(self, url, q):
+        """Nearest-rank quantile of the endpoint's recent latencies, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint_template(url)) or ())
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples), max(1, math.ceil(q * len(samples)))) - 1]
+
+    def timeouts(self, url):
+        """(connect, read) timeouts for a request: a few times the endpoint's p99 read, clamped."""
+        p50 = self.quantile(url, 0.5)
+        p99 = self.quantile(url, 0.99)
+        if p50 is None or p99 is None:
+            return (CONNECT_TIMEOUT, self.default_timeout)
+        connect = min(CONNECT_TIMEOUT, max(MIN_CONNECT_TIMEOUT, p50 * 2))
+        read = min(MAX_READ_TIMEOUT, max(MIN_READ_TIMEOUT, p99 * READ_TIMEOUT_FACTOR))
+        return (connect, read)
+
+    def hedge_delay(self, url):
+        """Seconds after which a duplicate GET may be sent, or None when hedging isn't warranted.
+
+        Hedges are capped at HEDGE_BUDGET_FRACTION of observed requests so a
+        slow API doesn't double our quota use.
+        """
+        delay = self.quantile(url, HEDGE_QUANTILE)
+        if delay is None:
+            return None
+        with self._lock:
+            if self._hedges >= max(1, self._requests * HEDGE_BUDGET_FRACTION):
+                return None
+        return delay
+
+    def record_hedge(self):
+        """Count a hedge against the budget."""
+        with self._lock:
+            self._hedges += 1
+
+    def reset(self):
+        """Forget all observations."""
+        with self._lock:
+            self._samples = {}
+            self._requests = 0
+            self._hedges = 0
@@ -1,27 +1,18 @@
 """Output writers: JSON dump and Markdown report generation."""
 
-import datetime
-import json
 import logging
 from urllib.parse import quote as url_quote
 
+from lib import codec
 from lib.utils import get_repository_status_indicator
 
 
 def save_to_json(data, filename="github_stats.json"):
     """Save the given data to a JSON file."""
     try:
+        # Non-JSON values (datetimes, etc.) are converted by the codec only when encountered.
         with open(filename, 'w', encoding='utf-8') as f:
-            def dt_converter(o):
-                if isinstance(o, datetime.datetime):
-                    return o.isoformat()
-                try:
-                    json.dumps(o)
-                    return o
-                except TypeError:
-                    return str(o)
-
-            json.dump(data, f, indent=4, default=dt_converter, ensure_ascii=False)
+            codec.dump(data, f, indent=True)
         logging.info(f"Data successfully saved to {filename}")
         print(f"Data saved to {filename}")
     except (IOError, TypeError) as e:
@@ -0,0 +1,321 @@
+"""Process-wide GitHub rate-limit scheduler driven by X-RateLimit-* response headers."""
+
+import logging
+import threading
+import time
+
+DEFAULT_RESOURCE = 'core'
+RESERVE_FRACTION = 0.1
+MIN_RESERVE = 50
+MAX_PACING_DELAY = 300
+MAX_CONCURRENT_REQUESTS = 8
+MIN_CONCURRENT_REQUESTS = 1
+
+
+def _header_int(headers, name):
+    """Parse an integer rate-limit header, returning None when absent or malformed."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def resource_for_url(url):
+    """Guess which rate-limit bucket a request will be charged to before it is sent."""
+    if '/graphql' in url:
+        return 'graphql'
+    if '/search/' in url:
+        return 'search'
+    return DEFAULT_RESOURCE
+
+
+class RateLimitScheduler:
+    """Spread requests so each rate-limit bucket lasts until its reset.
+
+    While a bucket holds more than its reserve (RESERVE_FRACTION of the limit,
+    at least MIN_RESERVE) requests go out unpaced. Below the reserve, requests
+    are spaced evenly over the time left until X-RateLimit-Reset. Requests that
+    are in flight count against the budget until their headers come back.
+    """
+
+    def __init__(self, reserve_fraction=RESERVE_FRACTION, min_reserve=MIN_RESERVE, max_delay=MAX_PACING_DELAY):
+        self.reserve_fraction = reserve_fraction
+        self.min_reserve = min_reserve
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._pending = {}
+        self._next_slot = {}
+
+    def _interval(self, resource):
+        """Seconds to leave between requests for a bucket, given what we know now."""
+        bucket = self._buckets.get(resource)
+        if not bucket:
+            return 0.0
+        seconds_left = bucket['reset'] - time.time()
+        if seconds_left <= 0:
+            return 0.0
+        remaining = bucket['remaining'] - self._pending.get(resource, 0)
+        if remaining <= 0:
+            return seconds_left + 1
+        reserve = max(self.min_reserve, bucket['limit'] * self.reserve_fraction)
+        if remaining > reserve:
+            return 0.0
+        return seconds_left / remaining
+
+    def acquire(self, resource=DEFAULT_RESOURCE):
+        """Block until the next request to `resource` may be sent; returns the seconds waited."""
+        with self._lock:
+            interval = min(self._interval(resource), self.max_delay)
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(resource, now))
+            bucket = self._buckets.get(resource)
+            if bucket and bucket['remaining'] - self._pending.get(resource, 0) <= 0:
+                # Exhausted: hold this request itself until the window resets.
+                slot = max(slot, now + interval)
+                self._next_slot[resource] = slot
+            else:
+                self._next_slot[resource] = slot + interval
+            self._pending[resource] = self._pending.get(resource, 0) + 1
+            wait = slot - now
+
+        if wait > 0:
+            if wait >= 1:
+                logging.info(f"Rate-limit pacing for '{resource}': waiting {wait:.1f}s.")
+            time.sleep(wait)
+        return wait
+
+    def release(self, resource=DEFAULT_RESOURCE, headers=None):
+        """Mark a request as finished and fold in the X-RateLimit-* headers it returned."""
+        with self._lock:
+            self._pending[resource] = max(0, self._pending.get(resource, 0) - 1)
+            if headers is not None:
+                self._update(resource, headers)
+
+    def _update(self, resource, headers):
+        remaining = _header_int(headers, 'X-RateLimit-Remaining')
+        limit = _header_int(headers, 'X-RateLimit-Limit')
+        reset = _header_int(headers, 'X-RateLimit-Reset')
+        if remaining is None or limit is None or reset is None:
+            return
+        resource = headers.get('X-RateLimit-Resource') or resource
+
+        bucket = self._buckets.get(resource)
+        if bucket and bucket['reset'] == reset:
+            # Responses can arrive out of order; within one window the budget only shrinks.
+            remaining = min(remaining, bucket['remaining'])
+        elif bucket and bucket['reset'] > reset:
+            return
+        self._buckets[resource] = {'limit': limit, 'remaining': remaining, 'reset': reset}
+
+    def mark_exhausted(self, resource, seconds):
+        """Record that a bucket is empty for the next `seconds` (e.g. after Retry-After)."""
+        with self._lock:
+            bucket = self._buckets.get(resource) or {'limit': 0}
+            self._buckets[resource] = {
+                'limit': bucket['limit'],
+                'remaining': 0,
+                'reset': int(time.time() + seconds),
+            }
+
+    def available(self, resource=DEFAULT_RESOURCE):
+        """Requests left in a bucket net of in-flight ones, or None when no headers were seen yet."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            if not bucket or bucket['reset'] <= time.time():
+                return None
+            return bucket['remaining'] - self._pending.get(resource, 0)
+
+    def seconds_until_reset(self, resource=DEFAULT_RESOURCE):
+        """Seconds until the bucket refills, or 0 when unknown."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return max(0.0, bucket['reset'] - time.time()) if bucket else 0.0
+
+    def snapshot(self):
+        """Return a copy of the known buckets: {resource: {limit, remaining, reset}}."""
+        with self._lock:
+            return {resource: dict(bucket) for resource, bucket in self._buckets.items()}
+
+
+class ConcurrencyLimiter:
+    """AIMD cap on in-flight requests.
+
+    Each successful response raises the limit by 1/limit (about one slot per
+    round of requests, up to `max_limit`); a secondary-rate-limit response
+    halves it. acquire() returns the current epoch, which every decrease
+    advances: responses to requests sent before the last decrease belong to
+    the burst that was already punished and don't halve the limit again.
+    """
+
+    def __init__(self, max_limit=MAX_CONCURRENT_REQUESTS, min_limit=MIN_CONCURRENT_REQUESTS):
+        self.max_limit = max(min_limit, max_limit)
+        self.min_limit = min_limit
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """Current number of requests allowed in flight."""
+        return max(self.min_limit, int(self._limit))
+
+    def acquire(self):
+        """Block until a slot is free under the current limit; returns the epoch the request is sent in."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+            return self._epoch
+
+    def try_acquire(self):
+        """Take a slot only if one is free right now; returns the epoch, or None without waiting."""
+        with self._condition:
+            if self._in_flight >= self.limit:
+                return None
+            self._in_flight += 1
+            return self._epoch
+
+    def release(self):
+        """Return a slot."""
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    def on_success(self, epoch=None):
+        """Additive increase, for requests sent since the last decrease."""
+        with self._condition:
+            if epoch is not None and epoch != self._epoch:
+                return
+            if self._limit < self.max_limit:
+                previous = self.limit
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+                if self.limit > previous:
+                    self._condition.notify_all()
+
+    def on_throttle(self, epoch=None):
+        """Multiplicative decrease, once per epoch; returns the new limit."""
+        with self._condition:
+            if epoch is None or epoch == self._epoch:
+                self._epoch += 1
+                self._limit = max(float(self.min_limit), self._limit / 2)
+                logging.warning(f"Secondary rate limit hit; lowering concurrency to {self.limit}.")
+            return self.limit
+
+
+def is_secondary_rate_limit(response):
+    """True for a 403/429 that signals GitHub's secondary (abuse) limits rather than an empty quota or a permission error."""
+    if response.status_code not in (403, 429):
+        return False
+    if 'Retry-After' in response.headers:
+        return True
+    if response.headers.get('X-RateLimit-Remaining') == '0':
+        return False
+    return response.status_code == 429 or 'secondary rate limit' in response.text.lower()
+
+
+def mask_token(token):
+    """Short, log-safe label for a token."""
+    return f"...{token[-4:]}" if token and len(token) > 4 else "..."
+
+
+class TokenPool:
+    """Several GitHub tokens, each with its own rate-limit scheduler.
+
+    Every request goes to the token with the most quota left on the target
+    bucket; tokens with no observed headers yet are tried first so their
+    budgets get discovered.
+    """
+
+    def __init__(self, tokens):
+        self._lock = threading.Lock()
+        self._tokens = []
+        self._schedulers = {}
+        for token in tokens:
+            if token and token not in self._schedulers:
+                self._tokens.append(token)
+                self._schedulers[token] = RateLimitScheduler()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def select(self, resource=DEFAULT_RESOURCE, exclude=None):
+        """Return (token, scheduler) with the most remaining quota for `resource`."""
+        with self._lock:
+            candidates = [token for token in self._tokens if token != exclude] or list(self._tokens)
+
+            def quota(token):
+                available = self._schedulers[token].available(resource)
+                return float('inf') if available is None else available
+
+            token = max(candidates, key=quota)
+            return token, self._schedulers[token]
+
+    def has_quota(self, resource=DEFAULT_RESOURCE, exclude=None):
+        """True when some token other than `exclude` may still have budget on `resource`."""
+        for token in self._tokens:
+            if token == exclude:
+                continue
+            available = self._schedulers[token].available(resource)
+            if available is None or available > 0:
+                return True
+        return False
+
+    def snapshot(self):
+        """Per-token bucket state, keyed by masked token label."""
+        return {mask_token(token): self._schedulers[token].snapshot() for token in self._tokens}
+
+
+_scheduler = RateLimitScheduler()
+_token_pool = None
+_concurrency = ConcurrencyLimiter()
+
+
+def get_rate_limit_scheduler():
+    """Return the process-wide rate-limit scheduler used when no token pool is configured."""
+    return _scheduler
+
+
+def configure_token_pool(tokens):
+    """Route authenticated requests through a pool of tokens; fewer than two disables the pool."""
+    global _token_pool
+    pool = TokenPool(tokens or [])
+    _token_pool = pool if len(pool) > 1 else None
+    if _token_pool:
+        logging.info(f"Token pool configured with {len(_token_pool)} tokens.")
+    return _token_pool
+
+
+def get_token_pool():
+    """Return the active token pool, or None when a single token (or none) is in use."""
+    return _token_pool
+
+
+def select_token(resource=DEFAULT_RESOURCE, exclude=None):
+    """Return (token, scheduler) for the next request; token is None without a pool."""
+    if _token_pool is None:
+        return None, _scheduler
+    return _token_pool.select(resource, exclude=exclude)
+
+
+def get_concurrency_limiter():
+    """Return the process-wide in-flight request limiter."""
+    return _concurrency
+
+
+def configure_concurrency(max_limit):
+    """Replace the in-flight limiter with one capped at `max_limit`."""
+    global _concurrency
+    _concurrency = ConcurrencyLimiter(max(MIN_CONCURRENT_REQUESTS, int(max_limit)))
+    return _concurrency
+
+
+def rate_limit_snapshot():
+    """Known rate-limit state: per token when pooled, otherwise for the shared scheduler."""
+    if _token_pool is not None:
+        return _token_pool.snapshot()
+    return _scheduler.snapshot()
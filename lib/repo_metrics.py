@@ -1,32 +1,59 @@
-"""Per-repository metric fetchers: issue resolution time, languages, latest version."""
+"""Per-repository metric fetchers: counts, issue resolution time, languages, latest version."""
 
-import json
+import asyncio
 import logging
-import time
 from urllib.parse import quote as url_quote
 
+from lib.cache import cached_immutable
+from lib.codec import JSONDecodeError, response_json
 from lib.github_api import (
     DEFAULT_PAGE_SIZE,
     GITHUB_API_BASE_URL,
+    get_resource_count,
+    iter_github_pages,
     make_github_request,
 )
 from lib.utils import get_human_readable_time, parse_github_datetime
 
 
+def get_commit_count(repo_full_name, headers, console):
+    """Count commits on the default branch with a header-only count probe; empty repositories count 0."""
+    commits_url = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}/commits"
+    count = get_resource_count(commits_url, headers, console=console)
+    if count is None:
+        logging.warning(f"Failed request for commit count link header for {repo_full_name}.")
+    return count
+
+
+def get_contributor_count(repo_full_name, headers, console):
+    """Count contributors (including anonymous) with a header-only count probe."""
+    contributors_url = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}/contributors"
+    count = get_resource_count(contributors_url, headers, params={'anon': 'true'}, console=console)
+    if count is None:
+        logging.warning(f"Failed request for contributor count for {repo_full_name}.")
+    return count
+
+
+def get_closed_issue_count(repo_full_name, headers, console):
+    """Count closed issues (GitHub includes PRs here) with a header-only count probe."""
+    issues_url = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}/issues"
+    count = get_resource_count(issues_url, headers, params={'state': 'closed'}, console=console)
+    if count is None:
+        logging.warning(f"Failed request for closed issue count for {repo_full_name}.")
+    return count
+
+
 def get_average_issue_resolution_time(repo_full_name, headers, console):
     """Calculate the average time to resolve issues for a single repository."""
     issues_url = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}/issues"
     total_resolution_seconds = 0.0
     closed_issue_count = 0
-    page = 1
     processed_any_pages = False
 
     logging.info(f"Calculating avg issue resolution time for {repo_full_name}...")
 
-    while True:
-        params = {'state': 'closed', 'page': page, 'per_page': DEFAULT_PAGE_SIZE}
-        response = make_github_request(issues_url, headers, params=params, console=console)
-
+    params = {'state': 'closed', 'per_page': DEFAULT_PAGE_SIZE}
+    for page, response in enumerate(iter_github_pages(issues_url, headers, params=params, console=console), start=1):
         if response is None:
             logging.warning(f"Could not retrieve closed issues page {page} for {repo_full_name}. Stopping calculation.")
             if not processed_any_pages:
@@ -35,11 +62,11 @@ def get_average_issue_resolution_time(repo_full_name, headers, console):
 
         processed_any_pages = True
         try:
-            issues = response.json()
+            issues = response_json(response)
             if not isinstance(issues, list):
                 logging.error(f"Unexpected JSON response type for issues of {repo_full_name} (page {page}): {type(issues)}")
                 return total_resolution_seconds / closed_issue_count if closed_issue_count > 0 else 0.0
-        except json.JSONDecodeError:
+        except JSONDecodeError:
             logging.error(f"Failed to decode JSON response for closed issues of {repo_full_name}, page {page}.")
             return total_resolution_seconds / closed_issue_count if closed_issue_count > 0 else 0.0
 
@@ -66,13 +93,6 @@ def get_average_issue_resolution_time(repo_full_name, headers, console):
 
         logging.debug(f"Processed page {page} for {repo_full_name}, found {len(issues)} items, {valid_issues_on_page} valid closed issues.")
 
-        if 'Link' in response.headers and 'rel="next"' in response.headers['Link']:
-            page += 1
-            time.sleep(0.1)
-        else:
-            logging.debug(f"No 'next' link found on page {page} for {repo_full_name}. Assuming last page.")
-            break
-
     if closed_issue_count > 0:
         average_seconds = total_resolution_seconds / closed_issue_count
         logging.info(f"Calculated average resolution time for {repo_full_name}: {average_seconds:.2f} seconds over {closed_issue_count} issues.")
@@ -82,44 +102,104 @@ def get_average_issue_resolution_time(repo_full_name, headers, console):
     return 0.0
 
 
+def summarize_language_bytes(languages):
+    """Turn a {language: bytes} mapping into {language: {bytes, percentage}}, largest first."""
+    total_bytes = sum(languages.values())
+    if total_bytes == 0:
+        return {}
+
+    language_stats = {}
+    for language, bytes_count in languages.items():
+        percentage = (bytes_count / total_bytes) * 100
+        language_stats[language] = {
+            'bytes': bytes_count,
+            'percentage': round(percentage, 2)
+        }
+
+    sorted_languages = dict(sorted(language_stats.items(),
+                                   key=lambda x: x[1]['percentage'],
+                                   reverse=True))
+
+    return sorted_languages
+
+
 def get_repository_languages(repo_full_name, headers, console):
-    """Fetch repository languages and their usage statistics."""
+    """Fetch repository languages and their usage statistics; {} when it has none, None if the fetch failed."""
     languages_url = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}/languages"
     response = make_github_request(languages_url, headers, console=console)
 
     if response is None:
-        return {}
+        return None
 
     try:
-        languages = response.json()
+        languages = response_json(response)
         if not isinstance(languages, dict):
             logging.warning(f"Unexpected response format for languages of {repo_full_name}")
-            return {}
+            return None
 
-        total_bytes = sum(languages.values())
-        if total_bytes == 0:
-            return {}
+        return summarize_language_bytes(languages)
 
-        language_stats = {}
-        for language, bytes_count in languages.items():
-            percentage = (bytes_count / total_bytes) * 100
-            language_stats[language] = {
-                'bytes': bytes_count,
-                'percentage': round(percentage, 2)
-            }
+    except JSONDecodeError:
+        logging.warning(f"Failed to decode languages JSON for {repo_full_name}")
+        return None
+    except Exception as e:
+        logging.warning(f"Error fetching languages for {repo_full_name}: {e}")
+        return None
 
-        sorted_languages = dict(sorted(language_stats.items(),
-                                       key=lambda x: x[1]['percentage'],
-                                       reverse=True))
 
-        return sorted_languages
+def release_version_info(repo_full_name, tag_name, html_url, published_at, title, body):
+    """Version info dict for a published release; rationale is the title or the body's first line."""
+    rationale_raw = title or ''
+    if not rationale_raw:
+        rationale_raw = (body or '').strip()
+    rationale = (rationale_raw or '').splitlines()[0][:120] if rationale_raw else ''
+    return {
+        'type': 'release',
+        'name': tag_name,
+        'url': html_url or f"https://github.com/{repo_full_name}/releases",
+        'date_api': published_at,
+        'date_str': get_human_readable_time(published_at) if published_at else 'Unknown',
+        'rationale': rationale
+    }
 
-    except json.JSONDecodeError:
-        logging.warning(f"Failed to decode languages JSON for {repo_full_name}")
-        return {}
+
+def tag_version_info(repo_full_name, tag_name, commit_date, commit_message):
+    """Version info dict for a tag; rationale is the tagged commit's subject line."""
+    msg = (commit_message or '').strip()
+    return {
+        'type': 'tag',
+        'name': tag_name,
+        'url': f"https://github.com/{repo_full_name}/tree/{url_quote(tag_name)}",
+        'date_api': commit_date,
+        'date_str': get_human_readable_time(commit_date) if commit_date else 'Unknown',
+        'rationale': msg.splitlines()[0][:120] if msg else ''
+    }
+
+
+def empty_version_info():
+    """Version info dict for a repository with neither releases nor tags."""
+    return {
+        'type': None,
+        'name': None,
+        'url': None,
+        'date_api': None,
+        'date_str': 'Unknown',
+        'rationale': ''
+    }
+
+
+def fetch_commit_summary(base_api, commit_sha, headers, console=None):
+    """Return {'date', 'message'} for a commit by SHA, or None if it can't be fetched."""
+    commit_resp = make_github_request(f"{base_api}/commits/{commit_sha}", headers, console=console)
+    if not commit_resp or commit_resp.status_code != 200:
+        return None
+    try:
+        info = (response_json(commit_resp).get('commit') or {})
+        date_str = (info.get('committer') or {}).get('date') or (info.get('author') or {}).get('date')
+        return {'date': date_str, 'message': info.get('message') or ''}
     except Exception as e:
-        logging.warning(f"Error fetching languages for {repo_full_name}: {e}")
-        return {}
+        logging.warning(f"Failed parsing commit {commit_sha} at {base_api}: {e}")
+        return None
 
 
 def get_latest_version_info(repo_full_name, headers, console=None):
@@ -127,74 +207,88 @@ def get_latest_version_info(repo_full_name, headers, console=None):
 
     Tries the latest release first. If none, falls back to the latest tag.
     Includes a short rationale (release body or commit message subject).
-    Returns a dict with keys: type, name, url, date_api, date_str, rationale.
+    Returns a dict with keys: type, name, url, date_api, date_str, rationale;
+    empty_version_info() when GitHub confirms there are neither releases nor
+    tags, and None when either request failed.
     """
     base_api = f"{GITHUB_API_BASE_URL}/repos/{repo_full_name}"
 
     release_url = f"{base_api}/releases/latest"
-    rel_resp = make_github_request(release_url, headers, console=console)
-    if rel_resp and rel_resp.status_code == 200:
+    rel_resp = make_github_request(release_url, headers, console=console, not_found_ok=True)
+    if rel_resp is None:
+        return None
+    if rel_resp.status_code == 200:
         try:
-            rel = rel_resp.json()
-            tag_name = rel.get('tag_name') or rel.get('name') or 'unknown'
-            html_url = rel.get('html_url') or f"https://github.com/{repo_full_name}/releases"
-            published_at = parse_github_datetime(rel.get('published_at'))
-            rationale_raw = rel.get('name') or ''
-            if not rationale_raw:
-                rationale_raw = (rel.get('body') or '').strip()
-            rationale = (rationale_raw or '').splitlines()[0][:120] if rationale_raw else ''
-            return {
-                'type': 'release',
-                'name': tag_name,
-                'url': html_url,
-                'date_api': published_at,
-                'date_str': get_human_readable_time(published_at) if published_at else 'Unknown',
-                'rationale': rationale
-            }
+            rel = response_json(rel_resp)
+            return release_version_info(
+                repo_full_name,
+                rel.get('tag_name') or rel.get('name') or 'unknown',
+                rel.get('html_url'),
+                parse_github_datetime(rel.get('published_at')),
+                rel.get('name'),
+                rel.get('body'),
+            )
         except Exception as e:
             logging.warning(f"Failed parsing latest release for {repo_full_name}: {e}")
+            return None
 
     tags_url = f"{base_api}/tags"
     tags_resp = make_github_request(tags_url, headers, params={'per_page': 1}, console=console)
-    if tags_resp and tags_resp.status_code == 200:
+    if tags_resp is None:
+        return None
+    if tags_resp.status_code == 200:
         try:
-            tags = tags_resp.json()
-            if isinstance(tags, list) and tags:
+            tags = response_json(tags_resp)
+            if not isinstance(tags, list):
+                logging.warning(f"Unexpected response format for tags of {repo_full_name}")
+                return None
+            if tags:
                 tag = tags[0]
                 tag_name = tag.get('name') or 'unknown'
                 commit_sha = ((tag.get('commit') or {}).get('sha'))
                 commit_date = None
-                rationale = ''
+                msg = ''
                 if commit_sha:
-                    commit_url = f"{base_api}/commits/{commit_sha}"
-                    commit_resp = make_github_request(commit_url, headers, console=console)
-                    if commit_resp and commit_resp.status_code == 200:
-                        try:
-                            c = commit_resp.json()
-                            info = (c.get('commit') or {})
-                            date_str = (info.get('committer') or {}).get('date') or (info.get('author') or {}).get('date')
-                            commit_date = parse_github_datetime(date_str)
-                            msg = (info.get('message') or '').strip()
-                            rationale = msg.splitlines()[0][:120] if msg else ''
-                        except Exception as e:
-                            logging.warning(f"Failed parsing commit {commit_sha} for {repo_full_name}: {e}")
-                tag_url = f"https://github.com/{repo_full_name}/tree/{url_quote(tag_name)}"
-                return {
-                    'type': 'tag',
-                    'name': tag_name,
-                    'url': tag_url,
-                    'date_api': commit_date,
-                    'date_str': get_human_readable_time(commit_date) if commit_date else 'Unknown',
-                    'rationale': rationale
-                }
+                    commit = cached_immutable(
+                        f"commit/{commit_sha}",
+                        lambda: fetch_commit_summary(base_api, commit_sha, headers, console),
+                    )
+                    if commit:
+                        commit_date = parse_github_datetime(commit.get('date'))
+                        msg = commit.get('message') or ''
+                return tag_version_info(repo_full_name, tag_name, commit_date, msg)
         except Exception as e:
             logging.warning(f"Failed parsing tags for {repo_full_name}: {e}")
+            return None
 
-    return {
-        'type': None,
-        'name': None,
-        'url': None,
-        'date_api': None,
-        'date_str': 'Unknown',
-        'rationale': ''
-    }
+    return empty_version_info()
+
+
+async def get_commit_count_async(repo_full_name, headers, console):
+    """Async wrapper around get_commit_count."""
+    return await asyncio.to_thread(get_commit_count, repo_full_name, headers, console)
+
+
+async def get_contributor_count_async(repo_full_name, headers, console):
+    """Async wrapper around get_contributor_count."""
+    return await asyncio.to_thread(get_contributor_count, repo_full_name, headers, console)
+
+
+async def get_closed_issue_count_async(repo_full_name, headers, console):
+    """Async wrapper around get_closed_issue_count."""
+    return await asyncio.to_thread(get_closed_issue_count, repo_full_name, headers, console)
+
+
+async def get_average_issue_resolution_time_async(repo_full_name, headers, console):
+    """Async wrapper around get_average_issue_resolution_time."""
+    return await asyncio.to_thread(get_average_issue_resolution_time, repo_full_name, headers, console)
+
+
+async def get_repository_languages_async(repo_full_name, headers, console):
+    """Async wrapper around get_repository_languages."""
+    return await asyncio.to_thread(get_repository_languages, repo_full_name, headers, console)
+
+
+async def get_latest_version_info_async(repo_full_name, headers, console=None):
+    """Async wrapper around get_latest_version_info."""
+    return await asyncio.to_thread(get_latest_version_info, repo_full_name, headers, console)
@@ -0,0 +1,121 @@
+"""Dependency-aware task runner: each task starts as soon as the tasks it reads from have finished."""
+
+import heapq
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class MetricTask:
+    """One unit of work: fn(*results of deps), keyed by any hashable (e.g. (full_name, metric))."""
+
+    def __init__(self, key, fn, deps=()):
+        self.key = key
+        self.fn = fn
+        self.deps = tuple(deps)
+
+    def __repr__(self):
+        return f"MetricTask({self.key!r}, deps={list(self.deps)!r})"
+
+
+class DependencyFailed(Exception):
+    """A task was not run because one of its dependencies raised."""
+
+    def __init__(self, key, error):
+        super().__init__(f"dependency {key!r} failed: {error}")
+        self.key = key
+        self.error = error
+
+
+class TaskCancelled(Exception):
+    """A task was not started because the run was told to stop, or one of its dependencies wasn't."""
+
+
+def run_task_graph(tasks, workers=1, on_done=None, should_stop=None):
+    """Run tasks in dependency order, up to `workers` at a time; returns (results, errors) keyed by task key.
+
+    Tasks whose dependencies have all finished run concurrently on a thread
+    pool (inline when workers <= 1), so the wall time is bounded by the
+    longest dependency chain rather than the number of tasks. At most
+    `workers` tasks are in flight; among ready tasks the one listed first
+    starts first, so list order is priority order. A task that
+    raises fails its dependents with DependencyFailed instead of running them.
+    Once should_stop() returns true, tasks that haven't started are cancelled
+    with TaskCancelled; running ones are allowed to finish.
+    on_done(task, result, error) is called from the calling thread as each
+    task finishes, in completion order.
+    """
+    tasks = {task.key: task for task in tasks}
+    position = {key: index for index, key in enumerate(tasks)}
+    waiting = {}
+    dependents = {key: [] for key in tasks}
+    for key, task in tasks.items():
+        missing = [dep for dep in task.deps if dep not in tasks]
+        if missing:
+            raise ValueError(f"Task {key!r} depends on unknown tasks {missing!r}")
+        waiting[key] = set(task.deps)
+        for dep in task.deps:
+            dependents[dep].append(key)
+
+    results = {}
+    errors = {}
+    ready = [(position[key], key) for key, deps in waiting.items() if not deps]
+    heapq.heapify(ready)
+
+    def finish(key, result, error):
+        if key in results or key in errors:
+            return
+        if error is None:
+            results[key] = result
+        else:
+            errors[key] = error
+        if on_done is not None:
+            on_done(tasks[key], result, error)
+        for dependent in dependents[key]:
+            if isinstance(error, TaskCancelled):
+                finish(dependent, None, error)
+                continue
+            if error is not None:
+                finish(dependent, None, DependencyFailed(key, error))
+                continue
+            waiting[dependent].discard(key)
+            if not waiting[dependent] and dependent not in errors:
+                heapq.heappush(ready, (position[dependent], dependent))
+
+    def arguments(task):
+        return [results[dep] for dep in task.deps]
+
+    def stopping():
+        return should_stop is not None and should_stop()
+
+    if workers <= 1:
+        while ready:
+            task = tasks[heapq.heappop(ready)[1]]
+            if stopping():
+                finish(task.key, None, TaskCancelled())
+                continue
+            try:
+                result, error = task.fn(*arguments(task)), None
+            except Exception as e:
+                result, error = None, e
+            finish(task.key, result, error)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metric-tasks") as pool:
+            running = {}
+            while ready or running:
+                while ready and len(running) < workers:
+                    task = tasks[heapq.heappop(ready)[1]]
+                    if stopping():
+                        finish(task.key, None, TaskCancelled())
+                        continue
+                    running[pool.submit(task.fn, *arguments(task))] = task.key
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    error = future.exception()
+                    finish(key, None if error else future.result(), error)
+
+    unfinished = [key for key in tasks if key not in results and key not in errors]
+    if unfinished:
+        logging.error(f"Task graph has a dependency cycle; never ran {unfinished!r}")
+        raise ValueError(f"Dependency cycle among tasks {unfinished!r}")
+    return results, errors
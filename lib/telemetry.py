@@ -0,0 +1,222 @@
+"""Request instrumentation: per-endpoint call counts, latency, bytes, retries and quota use."""
+
+import json
+import logging
+import math
+import os
+import threading
+from urllib.parse import urlsplit
+
+REQUEST_METRICS_JSON = "github_request_metrics.json"
+REQUEST_METRICS_PROM = "github_request_metrics.prom"
+LATENCY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+_OWNER_PLACEHOLDERS = {'users': '{u}', 'orgs': '{o}'}
+
+
+def endpoint_template(url):
+    """Collapse a request URL to its endpoint template, e.g. /repos/{r}/issues or /repos/{r}/commits/{sha}."""
+    segments = [segment for segment in urlsplit(url).path.split('/') if segment]
+    if not segments:
+        return '/'
+
+    if segments[0] == 'repos' and len(segments) >= 3:
+        rest = segments[3:]
+        if len(rest) == 2 and rest[0] in ('commits', 'git'):
+            rest = [rest[0], '{sha}']
+        template = ['repos', '{r}'] + rest
+    elif segments[0] in _OWNER_PLACEHOLDERS and len(segments) >= 2:
+        template = [segments[0], _OWNER_PLACEHOLDERS[segments[0]]] + segments[2:]
+    else:
+        template = segments
+
+    return '/' + '/'.join('{n}' if segment.isdigit() else segment for segment in template)
+
+
+def _quantile(sorted_values, q):
+    """Nearest-rank quantile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values)))) - 1
+    return sorted_values[index]
+
+
+def _new_endpoint():
+    """Empty per-endpoint accumulator."""
+    return {
+        'calls': 0,
+        'errors': 0,
+        'not_modified': 0,
+        'latencies': [],
+        'bytes': 0,
+        'retries': 0,
+        'hedges': 0,
+        'backoff_seconds': 0.0,
+        'pacing_seconds': 0.0,
+        'rate_limit_units': 0,
+        'status_codes': {},
+    }
+
+
+class RequestMetrics:
+    """Thread-safe accumulator of per-endpoint request statistics for one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _endpoint(self, template):
+        return self._endpoints.setdefault(template, _new_endpoint())
+
+    def record_response(self, url, latency, response):
+        """Record one HTTP exchange; 304s are free of quota and carry no body."""
+        template = endpoint_template(url)
+        status = response.status_code
+        if response._content_consumed:
+            body_bytes = len(response.content or b'')
+        else:
+            # Streamed responses (header-only probes) are measured by what the server announced.
+            body_bytes = int(response.headers.get('Content-Length') or 0)
+        with self._lock:
+            endpoint = self._endpoint(template)
+            endpoint['calls'] += 1
+            endpoint['latencies'].append(latency)
+            endpoint['bytes'] += body_bytes
+            endpoint['status_codes'][str(status)] = endpoint['status_codes'].get(str(status), 0) + 1
+            if status == 304:
+                endpoint['not_modified'] += 1
+            else:
+                endpoint['rate_limit_units'] += 1
+            if status >= 400:
+                endpoint['errors'] += 1
+
+    def record_failure(self, url, latency):
+        """Record a request that raised before a response arrived (timeout, connection error)."""
+        with self._lock:
+            endpoint = self._endpoint(endpoint_template(url))
+            endpoint['calls'] += 1
+            endpoint['errors'] += 1
+            endpoint['latencies'].append(latency)
+
+    def record_retry(self, url, backoff_seconds):
+        """Record a retry and the time slept before it."""
+        with self._lock:
+            endpoint = self._endpoint(endpoint_template(url))
+            endpoint['retries'] += 1
+            endpoint['backoff_seconds'] += backoff_seconds
+
+    def record_hedge(self, url):
+        """Record a duplicate request sent to cut tail latency; it costs quota like any other."""
+        with self._lock:
+            endpoint = self._endpoint(endpoint_template(url))
+            endpoint['hedges'] += 1
+            endpoint['rate_limit_units'] += 1
+
+    def record_pacing(self, url, seconds):
+        """Record time spent waiting on the rate-limit scheduler."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._endpoint(endpoint_template(url))['pacing_seconds'] += seconds
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._endpoints = {}
+
+    def summary(self):
+        """Per-endpoint summary with latency quantiles, plus run totals."""
+        with self._lock:
+            endpoints = {template: dict(data, latencies=sorted(data['latencies']))
+                         for template, data in self._endpoints.items()}
+
+        report = {'endpoints': {}, 'totals': _new_endpoint()}
+        totals = report['totals']
+        del totals['latencies'], totals['status_codes']
+        for template in sorted(endpoints):
+            data = endpoints[template]
+            latencies = data.pop('latencies')
+            data['latency_seconds'] = {
+                'sum': round(sum(latencies), 6),
+                'max': round(latencies[-1], 6) if latencies else 0.0,
+                **{f"p{int(q * 100)}": round(_quantile(latencies, q), 6) for q in LATENCY_QUANTILES},
+            }
+            report['endpoints'][template] = data
+            for key in totals:
+                totals[key] += data[key]
+        return report
+
+    def write_json(self, path=REQUEST_METRICS_JSON):
+        """Write the summary as a JSON report."""
+        _write_atomic(path, json.dumps(self.summary(), indent=2))
+        logging.info(f"Request metrics written to {path}")
+
+    def write_prometheus(self, path=REQUEST_METRICS_PROM):
+        """Write the summary in the Prometheus textfile-collector format."""
+        _write_atomic(path, format_prometheus(self.summary()))
+        logging.info(f"Prometheus request metrics written to {path}")
+
+
+def _label(value):
+    """Escape a Prometheus label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_prometheus(report):
+    """Render a RequestMetrics summary as Prometheus exposition text."""
+    counters = (
+        ('github_requests_total', 'calls', 'GitHub API requests by endpoint template.'),
+        ('github_request_errors_total', 'errors', 'Failed GitHub API requests (HTTP >= 400 or transport errors).'),
+        ('github_not_modified_total', 'not_modified', 'Conditional requests answered 304 Not Modified.'),
+        ('github_response_bytes_total', 'bytes', 'Decoded response body bytes.'),
+        ('github_request_retries_total', 'retries', 'Retried attempts.'),
+        ('github_request_hedges_total', 'hedges', 'Duplicate GETs sent past the endpoint p95.'),
+        ('github_request_backoff_seconds_total', 'backoff_seconds', 'Seconds slept before retries.'),
+        ('github_request_pacing_seconds_total', 'pacing_seconds', 'Seconds waited on the rate-limit scheduler.'),
+        ('github_rate_limit_units_total', 'rate_limit_units', 'Rate-limit units consumed (non-304 responses).'),
+    )
+    lines = []
+    for metric, key, help_text in counters:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for template, data in report['endpoints'].items():
+            lines.append(f'{metric}{{endpoint="{_label(template)}"}} {data[key]}')
+
+    metric = 'github_request_latency_seconds'
+    lines.append(f"# HELP {metric} GitHub API request latency by endpoint template.")
+    lines.append(f"# TYPE {metric} summary")
+    for template, data in report['endpoints'].items():
+        label = _label(template)
+        for q in LATENCY_QUANTILES:
+            value = data['latency_seconds'][f"p{int(q * 100)}"]
+            lines.append(f'{metric}{{endpoint="{label}",quantile="{q}"}} {value}')
+        lines.append(f'{metric}_sum{{endpoint="{label}"}} {data["latency_seconds"]["sum"]}')
+        lines.append(f'{metric}_count{{endpoint="{label}"}} {data["calls"]}')
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, text):
+    """Write through a temp file and rename, so scrapers never read a partial file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+_metrics = RequestMetrics()
+
+
+def get_request_metrics():
+    """Return the process-wide request metrics accumulator."""
+    return _metrics
+
+
+def write_request_metrics(json_path=REQUEST_METRICS_JSON, prom_path=REQUEST_METRICS_PROM):
+    """Write the run's request metrics as JSON and as a Prometheus textfile; never raises."""
+    try:
+        _metrics.write_json(json_path)
+        _metrics.write_prometheus(prom_path)
+        return True
+    except (IOError, OSError, TypeError) as e:
+        logging.warning(f"Error writing request metrics: {e}")
+        return False
@@ -1,10 +1,32 @@
 """Pure utility functions: datetime parsing, formatting, validation, file I/O, insights."""
 
 import datetime
+import functools
 import logging
 import os
 import shutil
 
+MEMO_CACHE_SIZE = 4096
+
+_run_now = None
+
+
+def set_run_now(now=None):
+    """Pin the "now" used by age-dependent helpers for the rest of the run (default: the current UTC time).
+
+    Pinning makes their results deterministic within a run and lets them be
+    memoized; the memo caches are cleared because their results depend on it.
+    """
+    global _run_now
+    _run_now = now or datetime.datetime.now(datetime.timezone.utc)
+    clear_memo_caches()
+    return _run_now
+
+
+def get_run_now():
+    """The pinned run time, or the current UTC time when none is pinned."""
+    return _run_now or datetime.datetime.now(datetime.timezone.utc)
+
 
 def validate_data_completeness(repositories, total_stars):
     """Validate that the collected data is complete and not corrupted."""
@@ -87,7 +109,11 @@ def get_human_readable_time(timestamp):
         logging.warning("Timestamp provided to get_human_readable_time is naive. Assuming UTC.")
         timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
 
-    now = datetime.datetime.now(datetime.timezone.utc)
+    return _human_readable_delta(timestamp, get_run_now())
+
+
+@functools.lru_cache(maxsize=MEMO_CACHE_SIZE)
+def _human_readable_delta(timestamp, now):
     time_diff = now - timestamp
 
     seconds = time_diff.total_seconds()
@@ -117,6 +143,13 @@ def parse_github_datetime(datetime_str):
     """Safely parses GitHub's ISO 8601 datetime strings."""
     if not datetime_str:
         return None
+    if isinstance(datetime_str, str):
+        return _parse_github_datetime(datetime_str)
+    return _parse_github_datetime.__wrapped__(datetime_str)
+
+
+@functools.lru_cache(maxsize=MEMO_CACHE_SIZE)
+def _parse_github_datetime(datetime_str):
     try:
         return datetime.datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
     except (ValueError, TypeError) as e:
@@ -139,8 +172,11 @@ def format_resolution_time(seconds):
     if abs(seconds) < 0.001:
         return "No Closed Issues"
 
-    seconds = float(seconds)
+    return _format_duration(float(seconds))
+
 
+@functools.lru_cache(maxsize=MEMO_CACHE_SIZE)
+def _format_duration(seconds):
     days, remainder = divmod(seconds, 86400)
     hours, remainder = divmod(remainder, 3600)
     minutes, sec = divmod(remainder, 60)
@@ -165,19 +201,31 @@ def format_resolution_time(seconds):
 
 def get_repository_status_indicator(repo):
     """Generate status indicator for repository based on various criteria."""
-    if repo.get('archived', False):
+    try:
+        return _status_indicator(
+            repo.get('archived', False), repo.get('disabled', False), repo.get('fork', False),
+            repo.get('last_update'), repo.get('description'), repo.get('private', False), get_run_now(),
+        )
+    except TypeError:  # unhashable field values
+        return _status_indicator.__wrapped__(
+            repo.get('archived', False), repo.get('disabled', False), repo.get('fork', False),
+            repo.get('last_update'), repo.get('description'), repo.get('private', False), get_run_now(),
+        )
+
+
+@functools.lru_cache(maxsize=MEMO_CACHE_SIZE)
+def _status_indicator(archived, disabled, fork, last_update, description, private, now):
+    if archived:
         return "📦 ARCHIVED"
 
-    if repo.get('disabled', False):
+    if disabled:
         return "🚫 DISABLED"
 
-    if repo.get('fork', False):
+    if fork:
         return "🍴 FORK"
 
-    last_update = repo.get('last_update')
     if last_update:
         try:
-            now = datetime.datetime.now(datetime.timezone.utc)
             days_since_update = (now - last_update).days
             if days_since_update > 365:
                 return "⚠️ INACTIVE"
@@ -188,10 +236,10 @@ def get_repository_status_indicator(repo):
         except Exception:
             pass
 
-    if not repo.get('description') or repo.get('description') == "No description":
+    if not description or description == "No description":
         return "📝 NO DESC"
 
-    if repo.get('private', False):
+    if private:
         return "🔒 PRIVATE"
 
     return "✅ ACTIVE"
@@ -215,7 +263,7 @@ def generate_repository_insights(repositories):
         'repository_ages': {'new': 0, 'mature': 0, 'old': 0}
     }
 
-    now = datetime.datetime.now(datetime.timezone.utc)
+    now = get_run_now()
 
     for repo in repositories:
         if repo.get('archived', False):
@@ -265,3 +313,32 @@ def generate_repository_insights(repositories):
     )[:5]
 
     return insights
+
+
+_MEMOIZED = {
+    'parse_github_datetime': _parse_github_datetime,
+    'get_human_readable_time': _human_readable_delta,
+    'format_resolution_time': _format_duration,
+    'get_repository_status_indicator': _status_indicator,
+}
+
+
+def memo_stats():
+    """Hit/miss counts, size and hit rate of each memoized helper."""
+    stats = {}
+    for name, cached in _MEMOIZED.items():
+        info = cached.cache_info()
+        calls = info.hits + info.misses
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'hit_rate': round(info.hits / calls, 3) if calls else 0.0,
+        }
+    return stats
+
+
+def clear_memo_caches():
+    """Empty every helper memo cache."""
+    for cached in _MEMOIZED.values():
+        cached.cache_clear()
@@ -4,13 +4,14 @@ Aegis Reporter - Weekly Repository Activity Summary
 Generates comprehensive weekly reports and sends via email/webhook
 """
 
-import json
 import os
 import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 from collections import defaultdict
-import requests
+
+from lib import codec
+from lib.github_api import get_session
 
 class AegisReporter:
     def __init__(self, data_path: str = 'docs/repositories-data.json'):
@@ -23,8 +24,8 @@ class AegisReporter:
     def _load_data(self) -> List[Dict[str, Any]]:
         """Load repository data from JSON file"""
         try:
-            with open(self.data_path, 'r') as f:
-                return json.load(f)
+            with open(self.data_path, 'rb') as f:
+                return codec.load(f)
         except FileNotFoundError:
             print(f"Error: {self.data_path} not found")
             sys.exit(1)
@@ -256,7 +257,7 @@ class AegisReporter:
                 }]
             }
             
-            response = requests.post(self.webhook_url, json=payload)
+            response = get_session().post(self.webhook_url, json=payload)
             response.raise_for_status()
             print("✅ Report sent to webhook successfully")
             return True
@@ -293,7 +294,7 @@ class AegisReporter:
                 ]
             }
             
-            response = requests.post(url, headers=headers, json=data)
+            response = get_session().post(url, headers=headers, json=data)
             response.raise_for_status()
             print("✅ Email sent successfully")
             return True
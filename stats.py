@@ -7,46 +7,115 @@ HTTP client, cache, per-repo metric fetchers, advanced signals, and output
 writers; this file wires them together and exposes the top-level CLI.
 """
 
-import json
+import argparse
+import asyncio
 import logging
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from rich.console import Console
-from rich.progress import track
+from rich.progress import Progress, track
 
 from lib.advanced_metrics import (
     calculate_bus_factor,
     calculate_issue_health,
+    calculate_issue_health_async,
     calculate_momentum_score,
+    calculate_momentum_score_async,
+    empty_momentum,
     fetch_recent_commits,
     fetch_top_contributors,
+    unknown_issue_health,
 )
-from lib.cache import CACHE_DURATION_HOURS, CACHE_FILE, load_cache, save_cache
+from lib.cache import (
+    CACHE_DURATION_HOURS,
+    CACHE_FILE,
+    INCREMENTAL_MAX_AGE_HOURS,
+    RESULT_KEY,
+    MetricUnavailable,
+    cached_metric,
+    cached_metric_async,
+    close_cache_store,
+    disable_immutable_cache,
+    disable_metric_cache,
+    enable_immutable_cache,
+    enable_metric_cache,
+    get_metric_cache,
+    load_cache,
+    load_immutable_cache,
+    load_metric_cache,
+    load_repository_snapshots,
+    load_stale_cache,
+    load_validator_store,
+    save_cache,
+    save_immutable_cache,
+    save_metric_cache,
+    save_repository_snapshots,
+    save_validator_store,
+)
+from lib.checkpoint import (
+    CHECKPOINT_FILE,
+    Checkpoint,
+    checkpoint_repository,
+    disable_checkpoint,
+    enable_checkpoint,
+    load_checkpoint,
+)
+from lib.codec import JSONDecodeError, response_json
 from lib.github_api import (
     DEFAULT_PAGE_SIZE,
     GITHUB_API_BASE_URL,
     INITIAL_RETRY_DELAY,
     MAX_RETRIES,
     MAX_RETRY_DELAY,
+    POOL_MAXSIZE,
     REQUEST_TIMEOUT,
+    close_session,
+    configure_session,
+    disable_conditional_requests,
+    disable_response_memo,
+    enable_conditional_requests,
+    enable_hedging,
+    enable_response_memo,
     get_count_from_link_header,
+    iter_github_pages,
     make_github_request,
+    set_max_concurrent_requests,
+)
+from lib.graphql import (
+    fetch_repository_details_batches,
+    issue_health_from_node,
+    parse_repository_node,
 )
 from lib.output import create_markdown_table, save_to_json
+from lib.rate_limit import MAX_CONCURRENT_REQUESTS, configure_token_pool, rate_limit_snapshot
+from lib.telemetry import write_request_metrics
 from lib.repo_metrics import (
     get_average_issue_resolution_time,
+    get_average_issue_resolution_time_async,
+    get_closed_issue_count,
+    get_closed_issue_count_async,
+    get_commit_count,
+    get_commit_count_async,
+    get_contributor_count,
+    get_contributor_count_async,
     get_latest_version_info,
+    get_latest_version_info_async,
     get_repository_languages,
+    get_repository_languages_async,
 )
+from lib.scheduler import DependencyFailed, MetricTask, TaskCancelled, run_task_graph
 from lib.utils import (
     format_resolution_time,
     generate_repository_insights,
     get_human_readable_time,
     get_repository_status_indicator,
+    memo_stats,
     parse_github_datetime,
     safe_file_write,
+    set_run_now,
     validate_data_completeness,
 )
 
@@ -62,326 +131,989 @@ __all__ = [
     'parse_github_datetime', 'format_resolution_time',
     'get_repository_status_indicator', 'generate_repository_insights',
     'get_average_issue_resolution_time', 'get_repository_languages',
-    'get_latest_version_info',
+    'get_latest_version_info', 'get_commit_count', 'get_contributor_count',
+    'get_closed_issue_count',
     'calculate_momentum_score', 'calculate_issue_health', 'calculate_bus_factor',
     'fetch_recent_commits', 'fetch_top_contributors',
     'save_to_json', 'create_markdown_table',
-    'get_user_repositories_stats', 'main',
+    'get_user_repositories_stats', 'get_user_repositories_stats_async', 'main',
 ]
 
 
-def get_user_repositories_stats(username, token=None, console=None):
-    """Fetch owned repos for a user, calculate stats, and sort by stars."""
-    if console is None:
-        console = Console()
-
+def build_request_headers(username, token=None):
+    """Build the default REST headers, adding the token when one is provided."""
     headers = {'Accept': 'application/vnd.github.v3+json'}
     if token:
         headers['Authorization'] = f'token {token}'
         logging.info(f"Using provided GitHub token for user {username}.")
     else:
         logging.warning(f"No GitHub token provided for user {username}. Rate limits will be stricter.")
+    return headers
+
 
+def fetch_repository_list(username, headers, console, account_kind='user'):
+    """List owned repos for a user (or all repos of an org) and return (repo_data, total_stars), or (None, None) on failure."""
     repo_data = {}
     total_stars = 0
-    page = 1
     all_repo_names = []
 
-    logging.info(f"Fetching repository list for user {username}...")
+    logging.info(f"Fetching repository list for {account_kind} {username}...")
+    if account_kind == 'org':
+        url = f"{GITHUB_API_BASE_URL}/orgs/{username}/repos"
+        params = {'per_page': DEFAULT_PAGE_SIZE, 'type': 'all', 'sort': 'full_name'}
+    else:
+        url = f"{GITHUB_API_BASE_URL}/users/{username}/repos"
+        params = {'per_page': DEFAULT_PAGE_SIZE, 'type': 'owner', 'sort': 'full_name'}
+    for page, response in enumerate(iter_github_pages(url, headers, params=params, console=console), start=1):
+        if response is None:
+            console.print(f"[red]Failed to fetch repository list (page {page}) for {username} after multiple retries. Aborting.[/red]")
+            return None, None
+
+        try:
+            repos = response_json(response)
+            if not isinstance(repos, list):
+                logging.error(f"Unexpected JSON response type for repo list (page {page}): {type(repos)}")
+                console.print(f"[red]Unexpected data format received for repository list (page {page}). Aborting.[/red]")
+                return None, None
+        except JSONDecodeError:
+            console.print(f"[red]Failed to decode JSON for repository list (page {page}). Aborting.[/red]")
+            return None, None
+
+        if not repos:
+            logging.info(f"No more repositories found for {username} on page {page}.")
+            break
+
+        logging.info(f"Processing page {page} of repositories ({len(repos)} found).")
+        page_repo_names = []
+        for repo in track(repos, description=f"Processing basic repo info (page {page})...", console=console, transient=True):
+            if not isinstance(repo, dict):
+                logging.warning(f"Skipping invalid item in repository list: {type(repo)}")
+                continue
+
+            full_name = repo.get('full_name')
+            if not full_name:
+                logging.warning(f"Skipping repository with missing 'full_name': {repo.get('name')}")
+                continue
+
+            repo_data[full_name] = {
+                'url': repo.get('html_url', '#'),
+                'name': repo.get('name', 'N/A'),
+                'full_name': full_name,
+                'description': repo.get('description') or "No description",
+                'stars': repo.get('stargazers_count', 0),
+                'forks': repo.get('forks_count', 0),
+                'watchers': repo.get('watchers_count', 0),
+                'language': repo.get('language', 'Not specified'),
+                'archived': repo.get('archived', False),
+                'disabled': repo.get('disabled', False),
+                'private': repo.get('private', False),
+                'fork': repo.get('fork', False),
+                'license': repo.get('license', {}).get('name') if repo.get('license') else 'No license',
+                'default_branch': repo.get('default_branch', 'main'),
+                'open_issues_count': repo.get('open_issues_count', 0),
+                'size': repo.get('size', 0),
+                'last_update': parse_github_datetime(repo.get('pushed_at') or repo.get('updated_at')),
+                'created_at_api': parse_github_datetime(repo.get('created_at')),
+                'updated_at_api': parse_github_datetime(repo.get('updated_at')),
+                'has_issues': repo.get('has_issues', False),
+                'commits': None,
+                'contributors': None,
+                'last_update_str': "Fetching...",
+                'avg_issue_resolution_time': None,
+                'closed_issues_count': None,
+                'processed_details': False
+            }
+            page_repo_names.append(full_name)
+            total_stars += repo_data[full_name]['stars']
+
+        all_repo_names.extend(page_repo_names)
+
+    logging.info(f"Fetched basic info for {len(all_repo_names)} repositories. Total stars: {total_stars:,}.")
+    return repo_data, total_stars
+
+
+DEFAULT_ACCOUNT = 'fabriziosalmi'
+# Accounts collected at once; each still runs its own detail fetching (see --workers / --async).
+MAX_CONCURRENT_ACCOUNTS = 4
+
+# Share of a --deadline budget kept back from detail fetching for in-flight requests and output.
+DEADLINE_RESERVE_FRACTION = 0.1
+
+# Per-repo fields filled by the detail fetchers; carried forward for repositories that haven't changed.
+DETAIL_FIELDS = (
+    'commits', 'contributors', 'avg_issue_resolution_time', 'closed_issues_count',
+    'language', 'language_stats', 'version', 'momentum', 'issue_health',
+)
+
+
+def repository_fingerprint(repo_info):
+    """What the listing says about a repo's state: last push, last update and star count."""
+    last_update = repo_info.get('last_update')
+    updated_at = repo_info.get('updated_at_api')
+    return [
+        last_update.isoformat() if last_update else None,
+        updated_at.isoformat() if updated_at else None,
+        repo_info.get('stars', 0),
+    ]
+
+
+def carry_forward_unchanged(repo_data, previous):
+    """Reuse the previous details of repos whose fingerprint is unchanged; returns their full names."""
+    carried = set()
+    if previous is None:
+        return carried
+    max_age = INCREMENTAL_MAX_AGE_HOURS * 3600
+    for full_name, repo_info in repo_data.items():
+        if repo_info['processed_details']:
+            continue
+        snapshot = previous.get(full_name)
+        if not snapshot or snapshot.get('fingerprint') != repository_fingerprint(repo_info):
+            continue
+        if time.time() - snapshot.get('refreshed_at', 0) >= max_age:
+            continue
+        repo_info.update({field: snapshot['details'].get(field) for field in DETAIL_FIELDS})
+        _apply_last_update_str(repo_info)
+        _finish_repository_details(repo_info, refreshed_at=snapshot.get('refreshed_at'))
+        carried.add(full_name)
+    logging.info(f"Incremental refresh: {len(carried)} of {len(repo_data)} repositories unchanged since the last run.")
+    return carried
+
+
+def restore_checkpointed(repo_data, checkpointed):
+    """Reuse the details of repos an interrupted run already finished; returns their full names.
+
+    Entries older than INCREMENTAL_MAX_AGE_HOURS, or whose listing fingerprint
+    has changed since they were written, are fetched again.
+    """
+    restored = set()
+    if not checkpointed:
+        return restored
+    max_age = INCREMENTAL_MAX_AGE_HOURS * 3600
+    for full_name, repo_info in repo_data.items():
+        saved = checkpointed.get(full_name)
+        if not saved or not saved.get('processed_details'):
+            continue
+        if saved.get('fingerprint') != repository_fingerprint(repo_info):
+            continue
+        if time.time() - (saved.get('checkpointed_at') or 0) >= max_age:
+            continue
+        repo_info.update({field: saved.get(field) for field in DETAIL_FIELDS + ('bus_factor', 'status')})
+        _apply_last_update_str(repo_info)
+        repo_info['processed_details'] = True
+        restored.add(full_name)
+    logging.info(f"Resume: {len(restored)} of {len(repo_data)} repositories restored from the checkpoint.")
+    return restored
+
+
+def repository_priority(repo_info, previous=None):
+    """Sort key for detail work, highest first: no earlier data to fall back on, then stars, then last push."""
+    full_name = repo_info['full_name']
+    cache = get_metric_cache()
+    has_previous = (previous is not None and previous.get(full_name) is not None) or (
+        cache is not None and cache.latest(full_name, 'commits')[0])
+    last_update = repo_info.get('last_update')
+    return (not has_previous, repo_info.get('stars', 0) or 0, last_update.timestamp() if last_update else 0)
+
+
+def prioritize_repositories(repo_data, previous=None):
+    """Full names of the repos still needing details, in priority order (see repository_priority)."""
+    pending = [repo_info for repo_info in repo_data.values() if not repo_info['processed_details']]
+    pending.sort(key=lambda repo_info: repository_priority(repo_info, previous), reverse=True)
+    return [repo_info['full_name'] for repo_info in pending]
+
+
+def deadline_passed(deadline):
+    """True once the time.time() deadline, if any, has been reached."""
+    return deadline is not None and time.time() >= deadline
+
+
+def fill_from_cache(repo_data, previous):
+    """Give repos the deadline cut off their last known details, however old; returns the names filled.
+
+    Values come from the previous snapshot, then from the metric cache ignoring
+    TTLs. These repos stay processed_details=False so they are neither
+    snapshotted nor checkpointed as fresh.
+    """
+    cache = get_metric_cache()
+    filled = set()
+    for full_name, repo_info in repo_data.items():
+        if repo_info['processed_details']:
+            continue
+        snapshot = previous.get(full_name) if previous is not None else None
+        details = dict(snapshot['details']) if snapshot else {}
+        for field in DETAIL_FIELDS:
+            if details.get(field) is None and cache is not None:
+                found, value = cache.latest(full_name, field)
+                if found:
+                    details[field] = value
+        if details.get('language_stats'):
+            _apply_language_stats(repo_info, details.pop('language_stats'))
+        repo_info.update({field: value for field, value in details.items() if value is not None})
+        _apply_last_update_str(repo_info)
+        repo_info['status'] = get_repository_status_indicator(repo_info)
+        repo_info['bus_factor'] = calculate_bus_factor(repo_info.get('contributors'))
+        if any(value is not None for value in details.values()):
+            filled.add(full_name)
+    return filled
+
+
+def _report_deadline(repo_data, previous, console):
+    """Fill what the deadline cut off from cache and say how much of the run that was."""
+    skipped = [full_name for full_name, repo_info in repo_data.items() if not repo_info['processed_details']]
+    if not skipped:
+        return
+    filled = fill_from_cache(repo_data, previous)
+    logging.warning(f"Deadline reached: {len(skipped)} repositories not refreshed; "
+                    f"{len(filled)} filled from cached values, {len(skipped) - len(filled)} left without details.")
+    console.print(f"[warning]Deadline reached: {len(skipped)} repositories use cached or no details.[/warning]")
+
+
+def record_repository_snapshots(repo_data, previous, reused):
+    """Remember the fingerprint and details of every repo refreshed this run whose counts were fetched.
+
+    `reused` names the repos whose details were carried forward or restored
+    from a checkpoint rather than fetched; their snapshots are left as they are.
+    """
+    if previous is None:
+        return
+    for full_name, repo_info in repo_data.items():
+        if full_name in reused or not repo_info.get('processed_details'):
+            continue
+        if repo_info.get('commits') is None or repo_info.get('contributors') is None:
+            continue
+        previous[full_name] = {
+            'fingerprint': repository_fingerprint(repo_info),
+            'refreshed_at': time.time(),
+            'details': {field: repo_info.get(field) for field in DETAIL_FIELDS},
+        }
+
+
+def _wants_language_stats(repo_info):
+    """Languages are skipped for archived and disabled repositories."""
+    return not repo_info.get('archived', False) and not repo_info.get('disabled', False)
+
+
+def _apply_language_stats(repo_info, language_stats):
+    """Store language stats and promote the dominant language to `language`."""
+    repo_info['language_stats'] = language_stats
+    if language_stats:
+        repo_info['language'] = list(language_stats.keys())[0]
+
+
+def _apply_last_update_str(repo_info):
+    """Render the human-readable age of the last push."""
+    if repo_info['last_update']:
+        repo_info['last_update_str'] = get_human_readable_time(repo_info['last_update'])
+    else:
+        repo_info['last_update_str'] = "Unknown"
+
+
+def _finish_repository_details(repo_info, bus_factor=None, refreshed_at=None):
+    """Fill the derived, request-free fields once all fetched metrics are in place, then checkpoint the repo.
+
+    refreshed_at is when carried-forward details were originally fetched (default: now).
+    """
+    full_name = repo_info['full_name']
+    repo_info['status'] = get_repository_status_indicator(repo_info)
+
+    if bus_factor is None:
+        bus_factor = calculate_bus_factor(repo_info.get('contributors'))
+    repo_info['bus_factor'] = bus_factor
+
+    momentum = repo_info['momentum']
+    issue_health = repo_info['issue_health']
+    logging.info(f"  Metrics for {full_name}: Momentum={momentum['score']}, Health={issue_health['health_score']}, BusFactor={bus_factor['bus_factor']}")
+
+    repo_info['processed_details'] = True
+    checkpoint_repository(repo_info, repository_fingerprint(repo_info), refreshed_at)
+
+
+def latest_version_name(version_info, full_name):
+    """Name of the latest release or tag, None when there is neither; raises MetricUnavailable if the lookup failed."""
+    if version_info is None:
+        raise MetricUnavailable(f"Latest version of {full_name} could not be fetched")
+    return version_info.get('name')
+
+
+def repository_metric_tasks(repo_info, headers, console):
+    """Declare one repository's detail metrics as tasks keyed (full_name, metric).
+
+    Only issue_health (needs avg_issue_resolution_time) and bus_factor (needs
+    contributors) have inputs; the rest can all run at once. A final
+    (full_name, None) task merges the values into repo_info once they are all in.
+    """
+    full_name = repo_info['full_name']
+    has_issues = repo_info.get('has_issues', True)
+    if not has_issues:
+        logging.info(f"Skipping issue resolution calculation for {full_name} as issues are disabled.")
+
+    def metric(name, fetch, deps=(), cache_none=False, placeholder=None):
+        def run(*inputs):
+            value = cached_metric(full_name, name, lambda: fetch(*inputs), cache_none=cache_none)
+            return placeholder() if value is None and placeholder is not None else value
+        return MetricTask((full_name, name), run, [(full_name, dep) for dep in deps])
+
+    def constant(name, value):
+        return MetricTask((full_name, name), lambda: value)
+
+    tasks = [
+        metric('commits', lambda: get_commit_count(full_name, headers, console)),
+        metric('contributors', lambda: get_contributor_count(full_name, headers, console)),
+        metric('avg_issue_resolution_time', lambda: get_average_issue_resolution_time(full_name, headers, console))
+        if has_issues else constant('avg_issue_resolution_time', 0.0),
+        metric('closed_issues_count', lambda: get_closed_issue_count(full_name, headers, console))
+        if has_issues else constant('closed_issues_count', 0),
+        metric('language_stats', lambda: get_repository_languages(full_name, headers, console), placeholder=dict)
+        if _wants_language_stats(repo_info) else constant('language_stats', {}),
+        metric('version', lambda: latest_version_name(get_latest_version_info(full_name, headers, console), full_name),
+               cache_none=True),
+        metric('momentum', lambda: calculate_momentum_score(full_name, repo_info.get('stars', 0), headers, console),
+               placeholder=empty_momentum),
+        metric(
+            'issue_health',
+            lambda avg_resolution_time: calculate_issue_health(
+                full_name, repo_info.get('open_issues_count', 0), avg_resolution_time, headers, console),
+            deps=['avg_issue_resolution_time'],
+            placeholder=unknown_issue_health,
+        ),
+        MetricTask((full_name, 'bus_factor'), calculate_bus_factor, [(full_name, 'contributors')]),
+    ]
+    names = [task.key[1] for task in tasks]
+
+    def merge(*values):
+        fetched = dict(zip(names, values))
+        bus_factor = fetched.pop('bus_factor')
+        _apply_last_update_str(repo_info)
+        for name, value in fetched.items():
+            if name == 'language_stats':
+                _apply_language_stats(repo_info, value)
+            else:
+                repo_info[name] = value
+        _finish_repository_details(repo_info, bus_factor)
+
+    tasks.append(MetricTask((full_name, None), merge, [task.key for task in tasks]))
+    return tasks
+
+
+def _detail_task_done(task, result, error, console):
+    """Report a repository whose details could not be merged; it is still marked processed."""
+    full_name, name = task.key
+    if name is not None or error is None or isinstance(error, TaskCancelled):
+        return
+    if isinstance(error, DependencyFailed):
+        error = error.error
+    logging.error(f"Unexpected error processing details for {full_name}: {error}", exc_info=error)
+    console.print(f"  [red]Error processing details for {full_name}: {error}. Skipping details.[/red]")
+
+
+def fetch_repository_details(repo_info, headers, console):
+    """Fetch every per-repo detail metric for one repository, updating repo_info in place."""
     try:
-        while True:
-            url = f"{GITHUB_API_BASE_URL}/users/{username}/repos"
-            params = {'page': page, 'per_page': DEFAULT_PAGE_SIZE, 'type': 'owner', 'sort': 'full_name'}
-            response = make_github_request(url, headers, params=params, console=console)
+        run_task_graph(
+            repository_metric_tasks(repo_info, headers, console),
+            on_done=lambda task, result, error: _detail_task_done(task, result, error, console),
+        )
+    except Exception as e:
+        logging.error(f"Unexpected error processing details for {repo_info['full_name']}: {e}", exc_info=True)
+        console.print(f"  [red]Error processing details for {repo_info['full_name']}: {e}. Skipping details.[/red]")
+    repo_info['processed_details'] = True
 
-            if response is None:
-                console.print(f"[red]Failed to fetch repository list (page {page}) for {username} after multiple retries. Aborting.[/red]")
-                return None, None, []
 
-            try:
-                repos = response.json()
-                if not isinstance(repos, list):
-                    logging.error(f"Unexpected JSON response type for repo list (page {page}): {type(repos)}")
-                    console.print(f"[red]Unexpected data format received for repository list (page {page}). Aborting.[/red]")
-                    return None, None, []
-            except json.JSONDecodeError:
-                console.print(f"[red]Failed to decode JSON for repository list (page {page}). Aborting.[/red]")
-                return None, None, []
-
-            if not repos:
-                logging.info(f"No more repositories found for {username} on page {page}.")
-                break
+# Metrics the GraphQL batch query provides; repos with all of them cached skip the batch.
+GRAPHQL_METRICS = ('commits', 'closed_issues_count', 'language_stats', 'version', 'momentum', 'issue_health')
 
-            logging.info(f"Processing page {page} of repositories ({len(repos)} found).")
-            page_repo_names = []
-            for repo in track(repos, description=f"Processing basic repo info (page {page})...", console=console, transient=True):
-                if not isinstance(repo, dict):
-                    logging.warning(f"Skipping invalid item in repository list: {type(repo)}")
-                    continue
-
-                full_name = repo.get('full_name')
-                if not full_name:
-                    logging.warning(f"Skipping repository with missing 'full_name': {repo.get('name')}")
-                    continue
-
-                repo_data[full_name] = {
-                    'url': repo.get('html_url', '#'),
-                    'name': repo.get('name', 'N/A'),
-                    'full_name': full_name,
-                    'description': repo.get('description') or "No description",
-                    'stars': repo.get('stargazers_count', 0),
-                    'forks': repo.get('forks_count', 0),
-                    'watchers': repo.get('watchers_count', 0),
-                    'language': repo.get('language', 'Not specified'),
-                    'archived': repo.get('archived', False),
-                    'disabled': repo.get('disabled', False),
-                    'private': repo.get('private', False),
-                    'fork': repo.get('fork', False),
-                    'license': repo.get('license', {}).get('name') if repo.get('license') else 'No license',
-                    'default_branch': repo.get('default_branch', 'main'),
-                    'open_issues_count': repo.get('open_issues_count', 0),
-                    'size': repo.get('size', 0),
-                    'last_update': parse_github_datetime(repo.get('pushed_at') or repo.get('updated_at')),
-                    'created_at_api': parse_github_datetime(repo.get('created_at')),
-                    'has_issues': repo.get('has_issues', False),
-                    'commits': None,
-                    'contributors': None,
-                    'last_update_str': "Fetching...",
-                    'avg_issue_resolution_time': None,
-                    'closed_issues_count': None,
-                    'processed_details': False
-                }
-                page_repo_names.append(full_name)
-                total_stars += repo_data[full_name]['stars']
 
-            all_repo_names.extend(page_repo_names)
+def _store_graphql_metrics(full_name, parsed):
+    """Cache the per-metric values parsed from a GraphQL node."""
+    cache = get_metric_cache()
+    if cache is None:
+        return
+    cache.store(full_name, 'commits', parsed['commits'])
+    cache.store(full_name, 'closed_issues_count', parsed['closed_issues_count'])
+    cache.store(full_name, 'language_stats', parsed['language_stats'])
+    cache.store(full_name, 'version', parsed['version_info'].get('name'))
+    cache.store(full_name, 'momentum', parsed['momentum'])
 
-            if 'Link' in response.headers and 'rel="next"' in response.headers['Link']:
-                page += 1
-                time.sleep(0.2)
-            else:
-                break
 
-        logging.info(f"Fetched basic info for {len(all_repo_names)} repositories. Total stars: {total_stars:,}.")
-        logging.info("Fetching detailed information for each repository...")
+def _apply_graphql_details(repo_info, node, headers, console):
+    """Fill repo_info from a GraphQL node; contributors and resolution time still come from REST."""
+    full_name = repo_info['full_name']
+    try:
+        _apply_last_update_str(repo_info)
+        parsed = parse_repository_node(full_name, node, repo_info.get('stars', 0))
+        _store_graphql_metrics(full_name, parsed)
+        repo_info['commits'] = parsed['commits']
+        repo_info['contributors'] = cached_metric(
+            full_name, 'contributors', lambda: get_contributor_count(full_name, headers, console))
+
+        if repo_info.get('has_issues', True):
+            repo_info['avg_issue_resolution_time'] = cached_metric(
+                full_name, 'avg_issue_resolution_time',
+                lambda: get_average_issue_resolution_time(full_name, headers, console))
+            repo_info['closed_issues_count'] = parsed['closed_issues_count']
+        else:
+            logging.info(f"Skipping issue resolution calculation for {full_name} as issues are disabled.")
+            repo_info['avg_issue_resolution_time'] = 0.0
+            repo_info['closed_issues_count'] = 0
 
-        repo_keys_to_process = list(repo_data.keys())
-        for full_name in track(repo_keys_to_process, description="Fetching detailed info", console=console):
-            if full_name not in repo_data:
-                logging.warning(f"Full name '{full_name}' from key list not found in repo_data dict. Skipping.")
-                continue
-            repo_info = repo_data[full_name]
-            repo_api_url_base = f"{GITHUB_API_BASE_URL}/repos/{full_name}"
+        if _wants_language_stats(repo_info):
+            _apply_language_stats(repo_info, parsed['language_stats'])
+        else:
+            repo_info['language_stats'] = {}
 
-            if repo_info['processed_details']:
-                continue
+        repo_info['version'] = parsed['version_info'].get('name')
+        repo_info['momentum'] = parsed['momentum']
+        repo_info['issue_health'] = issue_health_from_node(
+            parsed,
+            repo_info.get('open_issues_count', 0),
+            repo_info.get('avg_issue_resolution_time'),
+        )
+        cache = get_metric_cache()
+        if cache is not None:
+            cache.store(full_name, 'issue_health', repo_info['issue_health'])
 
-            try:
-                # --- Commit count (Link-header trick with per_page=1) ---
-                commits_url = f"{repo_api_url_base}/commits"
-                commits_response_count = make_github_request(commits_url, headers, params={'per_page': 1}, console=console)
-                commit_count = None
-
-                if commits_response_count:
-                    link_count = get_count_from_link_header(commits_response_count)
-                    if link_count is not None:
-                        commit_count = link_count
-                    elif commits_response_count.status_code == 200:
-                        try:
-                            commits_json = commits_response_count.json()
-                            commit_count = len(commits_json) if isinstance(commits_json, list) else 0
-                        except (json.JSONDecodeError, TypeError):
-                            logging.warning(f"Could not decode commits JSON for {full_name} when Link header was missing.")
-                            commit_count = 0
-                    elif commits_response_count.status_code == 409:
-                        logging.info(f"Repository {full_name} is empty (409 conflict on commits). Setting commit count to 0.")
-                        commit_count = 0
-                    else:
-                        logging.warning(f"Could not determine commit count for {full_name} via Link header. Status: {commits_response_count.status_code}")
-                        commit_count = 0
-                else:
-                    logging.warning(f"Failed request for commit count link header for {full_name}.")
-
-                repo_info['commits'] = commit_count
-
-                # --- Contributors count ---
-                contributors_url = f"{repo_api_url_base}/contributors"
-                contrib_response = make_github_request(contributors_url, headers, params={'per_page': 1, 'anon': 'true'}, console=console)
-                contributors_count = None
-
-                if contrib_response:
-                    link_count = get_count_from_link_header(contrib_response)
-                    if link_count is not None:
-                        contributors_count = link_count
-                    elif contrib_response.status_code == 200:
-                        try:
-                            contributors_json = contrib_response.json()
-                            contributors_count = len(contributors_json) if isinstance(contributors_json, list) else 0
-                        except (json.JSONDecodeError, TypeError):
-                            logging.warning(f"Could not decode contributors JSON for {full_name} when Link header was missing.")
-                            contributors_count = 0
-                    elif contrib_response.status_code == 204:
-                        logging.info(f"Repo {full_name} reported 204 No Content for contributors (may still be processing). Setting count to 0 for now.")
-                        contributors_count = 0
-                    else:
-                        logging.warning(f"Could not determine contributor count for {full_name}. Status: {contrib_response.status_code}")
-                        contributors_count = 0
+        _finish_repository_details(repo_info)
+
+    except Exception as e:
+        logging.error(f"Unexpected error processing details for {full_name}: {e}", exc_info=True)
+        console.print(f"  [red]Error processing details for {full_name}: {e}. Skipping details.[/red]")
+        repo_info['processed_details'] = True
+
+
+def fetch_repository_details_graphql(repo_data, headers, console, order=None, deadline=None):
+    """Fill per-repo details from batched GraphQL queries, falling back to REST per repo.
+
+    Repos are batched in `order` (default: listing order). Once `deadline` has
+    passed no further batch is queried and no repo, GraphQL or REST fallback, is started.
+    """
+    if order is None:
+        order = [full_name for full_name, repo_info in repo_data.items() if not repo_info['processed_details']]
+    pending = list(order)
+    cache = get_metric_cache()
+    cached = [full_name for full_name in pending if cache is not None and cache.is_fresh(full_name, GRAPHQL_METRICS)]
+    pending = [full_name for full_name in pending if full_name not in cached]
+    with Progress(console=console) as progress:
+        task_id = progress.add_task("Fetching detailed info (GraphQL)", total=len(pending) + len(cached))
+        for full_name in cached:
+            fetch_repository_details(repo_data[full_name], headers, console)
+            progress.advance(task_id)
+        batches = fetch_repository_details_batches(pending, headers, console,
+                                                   should_stop=lambda: deadline_passed(deadline))
+        for batch, nodes in batches:
+            for full_name in batch:
+                if deadline_passed(deadline):
+                    break
+                repo_info = repo_data[full_name]
+                node = nodes.get(full_name) if nodes else None
+                if node is None:
+                    logging.warning(f"No GraphQL data for {full_name}; falling back to REST.")
+                    fetch_repository_details(repo_info, headers, console)
                 else:
-                    logging.warning(f"Failed request for contributor count for {full_name}.")
+                    _apply_graphql_details(repo_info, node, headers, console)
+                progress.advance(task_id)
 
-                repo_info['contributors'] = contributors_count
 
-                # --- Last update string ---
-                if repo_info['last_update']:
-                    repo_info['last_update_str'] = get_human_readable_time(repo_info['last_update'])
-                else:
-                    repo_info['last_update_str'] = "Unknown"
+async def _completed(value):
+    """Awaitable that resolves immediately, for metrics skipped without a request."""
+    return value
 
-                # --- Average issue resolution time ---
-                has_issues = repo_info.get('has_issues', True)
-                avg_res_time_secs = None
 
-                if has_issues:
-                    avg_res_time_secs = get_average_issue_resolution_time(full_name, headers, console)
-                else:
-                    logging.info(f"Skipping issue resolution calculation for {full_name} as issues are disabled.")
-                    avg_res_time_secs = 0.0
-
-                repo_info['avg_issue_resolution_time'] = avg_res_time_secs
-
-                # --- Closed issue count ---
-                closed_issues_count = None
-
-                if has_issues:
-                    issues_url = f"{repo_api_url_base}/issues"
-                    issues_response = make_github_request(issues_url, headers, params={'state': 'closed', 'per_page': 1}, console=console)
-                    if issues_response:
-                        link_count = get_count_from_link_header(issues_response)
-                        if link_count is not None:
-                            closed_issues_count = link_count
-                        elif issues_response.status_code == 200:
-                            try:
-                                issues_json = issues_response.json()
-                                closed_issues_count = len(issues_json) if isinstance(issues_json, list) else 0
-                            except (json.JSONDecodeError, TypeError):
-                                logging.warning(f"Could not decode issues JSON for {full_name} when Link header was missing.")
-                                closed_issues_count = 0
-                        else:
-                            logging.warning(f"Could not determine closed issue count for {full_name}. Status: {issues_response.status_code}")
-                            closed_issues_count = 0
-                    else:
-                        logging.warning(f"Failed request for closed issue count for {full_name}.")
-                else:
-                    closed_issues_count = 0
+async def fetch_repository_details_async(repo_info, headers, console):
+    """Async variant of fetch_repository_details; independent metrics run concurrently."""
+    full_name = repo_info['full_name']
+    try:
+        _apply_last_update_str(repo_info)
+        has_issues = repo_info.get('has_issues', True)
+        if not has_issues:
+            logging.info(f"Skipping issue resolution calculation for {full_name} as issues are disabled.")
+
+        async def fetch_version_name():
+            return latest_version_name(await get_latest_version_info_async(full_name, headers, console), full_name)
+
+        commits, contributors, avg_res_time_secs, closed_issues_count, language_stats, version, momentum = await asyncio.gather(
+            cached_metric_async(full_name, 'commits', lambda: get_commit_count_async(full_name, headers, console)),
+            cached_metric_async(full_name, 'contributors', lambda: get_contributor_count_async(full_name, headers, console)),
+            cached_metric_async(
+                full_name, 'avg_issue_resolution_time',
+                lambda: get_average_issue_resolution_time_async(full_name, headers, console),
+            ) if has_issues else _completed(0.0),
+            cached_metric_async(
+                full_name, 'closed_issues_count', lambda: get_closed_issue_count_async(full_name, headers, console),
+            ) if has_issues else _completed(0),
+            cached_metric_async(
+                full_name, 'language_stats', lambda: get_repository_languages_async(full_name, headers, console),
+            ) if _wants_language_stats(repo_info) else _completed({}),
+            cached_metric_async(full_name, 'version', fetch_version_name, cache_none=True),
+            cached_metric_async(
+                full_name, 'momentum',
+                lambda: calculate_momentum_score_async(full_name, repo_info.get('stars', 0), headers, console),
+            ),
+        )
+
+        repo_info['commits'] = commits
+        repo_info['contributors'] = contributors
+        repo_info['avg_issue_resolution_time'] = avg_res_time_secs
+        repo_info['closed_issues_count'] = closed_issues_count
+        _apply_language_stats(repo_info, language_stats if language_stats is not None else {})
+        repo_info['version'] = version
+        repo_info['momentum'] = momentum if momentum is not None else empty_momentum()
+        issue_health = await cached_metric_async(
+            full_name, 'issue_health',
+            lambda: calculate_issue_health_async(
+                full_name,
+                repo_info.get('open_issues_count', 0),
+                avg_res_time_secs,
+                headers, console
+            ),
+        )
+        repo_info['issue_health'] = issue_health if issue_health is not None else unknown_issue_health()
+
+        _finish_repository_details(repo_info)
 
-                repo_info['closed_issues_count'] = closed_issues_count
+    except Exception as e:
+        logging.error(f"Unexpected error processing details for {full_name}: {e}", exc_info=True)
+        console.print(f"  [red]Error processing details for {full_name}: {e}. Skipping details.[/red]")
+        repo_info['processed_details'] = True
 
-                # --- Language statistics (skip archived/disabled) ---
-                if not repo_info.get('archived', False) and not repo_info.get('disabled', False):
-                    language_stats = get_repository_languages(full_name, headers, console)
-                    repo_info['language_stats'] = language_stats
 
-                    if language_stats:
-                        primary_language = list(language_stats.keys())[0]
-                        repo_info['language'] = primary_language
-                else:
-                    repo_info['language_stats'] = {}
+def _summarize_repositories(repo_data):
+    """Sort processed repos by stars and return (processed_repos, top_10_repo_full_names)."""
+    processed_repos = list(repo_data.values())
+    processed_repos.sort(key=lambda repo: repo.get('stars', 0) or 0, reverse=True)
 
-                # --- Latest version (release/tag) ---
-                version_info = get_latest_version_info(full_name, headers, console)
-                repo_info['version'] = version_info.get('name')
+    top_10_repos = processed_repos[:10]
+    top_10_repo_full_names = [repo['full_name'] for repo in top_10_repos if repo.get('full_name')]
 
-                repo_info['status'] = get_repository_status_indicator(repo_info)
+    logging.info("Finished processing all repositories.")
+    return processed_repos, top_10_repo_full_names
+
+
+def fetch_repository_details_pooled(repo_data, headers, console, workers, order=None, deadline=None):
+    """Fetch the detail metrics of every unprocessed repo as one task graph on `workers` threads.
+
+    Ready metrics of all repositories share the pool, so a repo finishes one
+    dependency chain after its first request. Each repo's values are merged by
+    its own final task; the progress bar advances as repos complete. Repos
+    start in `order`; after `deadline` no new task starts and cut-off repos
+    stay unprocessed.
+    """
+    if order is None:
+        order = [full_name for full_name, repo_info in repo_data.items() if not repo_info['processed_details']]
+    pending = [repo_data[full_name] for full_name in order]
+    tasks = []
+    for repo_info in pending:
+        tasks.extend(repository_metric_tasks(repo_info, headers, console))
+
+    with Progress(console=console) as progress:
+        task_id = progress.add_task("Fetching detailed info", total=len(pending))
+
+        def on_done(task, result, error):
+            full_name, name = task.key
+            _detail_task_done(task, result, error, console)
+            if name is None and not isinstance(error, TaskCancelled):
+                repo_data[full_name]['processed_details'] = True
+                progress.advance(task_id)
+
+        run_task_graph(tasks, workers=workers, on_done=on_done, should_stop=lambda: deadline_passed(deadline))
+
+
+def get_user_repositories_stats(username, token=None, console=None, backend='rest', previous=None, workers=1,
+                                checkpointed=None, deadline=None, account_kind='user'):
+    """Fetch owned repos for a user (or an org, with account_kind='org'), calculate stats, and sort by stars.
+
+    backend='graphql' batches most per-repo fields into GraphQL queries (requires a token).
+    `previous` maps full names to snapshots from earlier runs (see load_repository_snapshots);
+    repos whose listing fingerprint is unchanged keep their details without any detail requests.
+    workers > 1 fetches REST details for that many repos at once; the number of requests
+    in flight is capped by the shared limiter (see size_request_concurrency). `checkpointed` maps full names to repos finished by an interrupted
+    run (see load_checkpoint); those are not fetched again. Details are fetched in
+    priority order (see repository_priority); repos not reached by the time.time()
+    `deadline` are filled from cached values instead.
+    """
+    if console is None:
+        console = Console()
 
-                # --- Advanced metrics ---
-                momentum = calculate_momentum_score(
-                    full_name, repo_info.get('stars', 0), headers, console
-                )
-                repo_info['momentum'] = momentum
+    headers = build_request_headers(username, token)
+    if backend == 'graphql' and not token:
+        logging.warning("The GraphQL backend requires a token. Falling back to REST.")
+        backend = 'rest'
 
-                issue_health = calculate_issue_health(
-                    full_name,
-                    repo_info.get('open_issues_count', 0),
-                    repo_info.get('avg_issue_resolution_time'),
-                    headers, console
-                )
-                repo_info['issue_health'] = issue_health
+    try:
+        repo_data, total_stars = fetch_repository_list(username, headers, console, account_kind)
+        if repo_data is None:
+            return None, None, []
+        restored = restore_checkpointed(repo_data, checkpointed)
+        carried = carry_forward_unchanged(repo_data, previous)
 
-                bus_factor = calculate_bus_factor(repo_info.get('contributors'))
-                repo_info['bus_factor'] = bus_factor
+        order = prioritize_repositories(repo_data, previous)
 
-                logging.info(f"  Metrics for {full_name}: Momentum={momentum['score']}, Health={issue_health['health_score']}, BusFactor={bus_factor['bus_factor']}")
+        logging.info(f"Fetching detailed information for each repository ({backend} backend)...")
+        if backend == 'graphql':
+            fetch_repository_details_graphql(repo_data, headers, console, order=order, deadline=deadline)
+        elif workers > 1:
+            fetch_repository_details_pooled(repo_data, headers, console, workers, order=order, deadline=deadline)
 
-                repo_info['processed_details'] = True
-                time.sleep(0.1)
+        repo_keys_to_process = [] if backend == 'graphql' or workers > 1 else order
+        for full_name in track(repo_keys_to_process, description="Fetching detailed info", console=console):
+            if deadline_passed(deadline):
+                break
+            repo_info = repo_data[full_name]
 
-            except Exception as e:
-                logging.error(f"Unexpected error processing details for {full_name}: {e}", exc_info=True)
-                console.print(f"  [red]Error processing details for {full_name}: {e}. Skipping details.[/red]")
-                repo_info['processed_details'] = True
+            if repo_info['processed_details']:
                 continue
 
+            fetch_repository_details(repo_info, headers, console)
+
+        record_repository_snapshots(repo_data, previous, carried | restored)
+        _report_deadline(repo_data, previous, console)
+
     except Exception as e:
         logging.error(f"An unexpected error occurred during repository fetching/processing: {e}", exc_info=True)
         console.print(f"[bold red]An critical error occurred: {e}[/]")
         return None, None, []
 
-    processed_repos = list(repo_data.values())
-    processed_repos.sort(key=lambda repo: repo.get('stars', 0) or 0, reverse=True)
+    processed_repos, top_10_repo_full_names = _summarize_repositories(repo_data)
+    return processed_repos, total_stars, top_10_repo_full_names
 
-    top_10_repos = processed_repos[:10]
-    top_10_repo_full_names = [repo['full_name'] for repo in top_10_repos if repo.get('full_name')]
 
-    logging.info("Finished processing all repositories.")
+async def get_user_repositories_stats_async(username, token=None, console=None, max_concurrency=MAX_CONCURRENT_REQUESTS,
+                                            previous=None, checkpointed=None, deadline=None, account_kind='user'):
+    """Async variant of get_user_repositories_stats running max_concurrency fetches at once.
+
+    Requests in flight are capped by the shared limiter (see size_request_concurrency).
+    Repos past the deadline are cancelled and filled from cached values.
+    """
+    if console is None:
+        console = Console()
+
+    headers = build_request_headers(username, token)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="github-fetch")
+    loop.set_default_executor(executor)
+
+    try:
+        repo_data, total_stars = await asyncio.to_thread(
+            fetch_repository_list, username, headers, console, account_kind)
+        if repo_data is None:
+            return None, None, []
+        restored = restore_checkpointed(repo_data, checkpointed)
+        carried = carry_forward_unchanged(repo_data, previous)
+
+        logging.info(f"Fetching detailed information for each repository (max {max_concurrency} concurrent requests)...")
+
+        pending = [
+            asyncio.create_task(fetch_repository_details_async(repo_data[full_name], headers, console))
+            for full_name in prioritize_repositories(repo_data, previous)
+        ]
+        timeout = None if deadline is None else max(0.0, deadline - time.time())
+        with Progress(console=console) as progress:
+            task_id = progress.add_task("Fetching detailed info", total=len(pending))
+            try:
+                for finished in asyncio.as_completed(pending, timeout=timeout):
+                    await finished
+                    progress.advance(task_id)
+            except asyncio.TimeoutError:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        record_repository_snapshots(repo_data, previous, carried | restored)
+        _report_deadline(repo_data, previous, console)
+
+    except Exception as e:
+        logging.error(f"An unexpected error occurred during repository fetching/processing: {e}", exc_info=True)
+        console.print(f"[bold red]An critical error occurred: {e}[/]")
+        return None, None, []
+
+    processed_repos, top_10_repo_full_names = _summarize_repositories(repo_data)
     return processed_repos, total_stars, top_10_repo_full_names
 
 
-def main():
+def cached_results(data, accounts):
+    """{account name: repositories} from a cached result; single-account entries may lack 'accounts'."""
+    if data.get('accounts'):
+        return data['accounts']
+    return {accounts[0][1]: data.get('repositories', [])}
+
+
+def detail_deadline(start_time, seconds):
+    """When detail fetching must stop for a run of `seconds` to finish on time, or None for no deadline.
+
+    DEADLINE_RESERVE_FRACTION of the budget is kept for requests already in
+    flight, filling from cache and writing the output.
+    """
+    if not seconds:
+        return None
+    return start_time + seconds * (1 - DEADLINE_RESERVE_FRACTION)
+
+
+def read_github_tokens():
+    """Collect tokens from MY_PAT and the comma-separated GITHUB_TOKENS, in order, without duplicates."""
+    tokens = []
+    candidates = [os.environ.get('MY_PAT', '')] + os.environ.get('GITHUB_TOKENS', '').split(',')
+    for candidate in candidates:
+        candidate = candidate.strip()
+        if candidate and candidate not in tokens:
+            tokens.append(candidate)
+    return tokens
+
+
+def parse_accounts(spec):
+    """Parse 'name', 'user:name' or 'org:name' entries, comma-separated, into (kind, name) pairs."""
+    accounts = []
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, _, name = entry.rpartition(':')
+        kind = kind or 'user'
+        if kind not in ('user', 'org') or not name:
+            raise argparse.ArgumentTypeError(f"Invalid account '{entry}'; expected NAME, user:NAME or org:NAME")
+        accounts.append((kind, name))
+    return accounts
+
+
+def requested_accounts(args):
+    """The (kind, name) accounts to collect, without duplicates; defaults to DEFAULT_ACCOUNT."""
+    accounts = []
+    for group in args.accounts or [[('user', DEFAULT_ACCOUNT)]]:
+        for account in group:
+            if account not in accounts:
+                accounts.append(account)
+    return accounts
+
+
+def result_cache_key(accounts):
+    """Cache key of the collected result for this set of accounts."""
+    if accounts == [('user', DEFAULT_ACCOUNT)]:
+        return RESULT_KEY
+    return f"{RESULT_KEY}:" + ",".join(f"{kind}:{name}" for kind, name in sorted(accounts))
+
+
+def parse_args(argv=None):
+    """Parse command-line options for the stats collector."""
+    parser = argparse.ArgumentParser(description="Collect GitHub repository statistics.")
+    parser.add_argument('--account', dest='accounts', action='append', type=parse_accounts, metavar='[org:]NAME',
+                        help="User or org (prefix 'org:') to collect; repeatable or comma-separated "
+                             f"(default: {DEFAULT_ACCOUNT})")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Collect per-repo details with the asyncio engine")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Threads fetching REST per-repo details concurrently without --async (default: 1)")
+    parser.add_argument('--max-concurrency', type=int, default=MAX_CONCURRENT_REQUESTS,
+                        help=f"Maximum in-flight GitHub requests for --async (default: {MAX_CONCURRENT_REQUESTS})")
+    parser.add_argument('--backend', choices=('rest', 'graphql'), default='rest',
+                        help="Per-repo detail backend; 'graphql' batches repos into aliased queries (default: rest)")
+    parser.add_argument('--resume', action='store_true',
+                        help=f"Skip repositories an interrupted run already finished (from {CHECKPOINT_FILE})")
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help="Finish within SECONDS: refresh high-priority repos first, fill the rest from cache")
+    parser.add_argument('--hedge', action='store_true',
+                        help="Send a duplicate of GETs that run past their endpoint's p95 latency")
+    parser.add_argument('--stale-while-revalidate', action='store_true',
+                        help="When the cache has expired, publish the stale data first, then refresh and rewrite it")
+    return parser.parse_args(argv)
+
+
+def size_request_concurrency(args):
+    """Size the shared request limiter and HTTP session once for the backend chosen by args.
+
+    All accounts of a run share them, so this is done before any collection starts.
+    """
+    if args.use_async and args.backend != 'graphql':
+        limit = args.max_concurrency
+    elif args.workers > 1:
+        limit = args.workers
+    else:
+        return
+    set_max_concurrent_requests(limit)
+    if limit > POOL_MAXSIZE:
+        configure_session(pool_maxsize=limit)
+
+
+def collect_account(args, account, token, console, previous=None, checkpointed=None, deadline=None):
+    """Collect one user's or org's repositories with the backend chosen by args; returns them or None."""
+    kind, name = account
+    if args.use_async and args.backend != 'graphql':
+        repositories, _, _ = asyncio.run(get_user_repositories_stats_async(
+            name, token, console, max_concurrency=args.max_concurrency, previous=previous,
+            checkpointed=checkpointed, deadline=deadline, account_kind=kind,
+        ))
+    else:
+        repositories, _, _ = get_user_repositories_stats(
+            name, token, console, backend=args.backend, previous=previous, workers=args.workers,
+            checkpointed=checkpointed, deadline=deadline, account_kind=kind,
+        )
+    return repositories
+
+
+def collect_repositories(args, accounts, token, console, deadline=None):
+    """Run one collection pass with validators, the response memo and the metric/immutable caches enabled.
+
+    Several accounts are collected concurrently (up to MAX_CONCURRENT_ACCOUNTS)
+    over the same session, caches and rate-limit scheduler; their progress is
+    shown per account rather than per repo. Returns {account name: repositories
+    or None}. Finished repositories are checkpointed as they complete; the
+    checkpoint is deleted once every account succeeds and kept for --resume otherwise.
+    """
+    enable_conditional_requests(load_validator_store())
+    enable_response_memo()
+    enable_metric_cache(load_metric_cache())
+    enable_immutable_cache(load_immutable_cache())
+    snapshots = load_repository_snapshots()
+    checkpointed = load_checkpoint() if args.resume else None
+    enable_checkpoint(Checkpoint(CHECKPOINT_FILE, resume=args.resume))
+    size_request_concurrency(args)
+    if args.use_async and args.backend == 'graphql':
+        logging.warning("--async is not supported with the GraphQL backend; running GraphQL batches.")
+    results = {name: None for _, name in accounts}
+    try:
+        if len(accounts) == 1:
+            results[accounts[0][1]] = collect_account(
+                args, accounts[0], token, console, snapshots, checkpointed, deadline)
+        else:
+            workers = min(len(accounts), MAX_CONCURRENT_ACCOUNTS)
+            with Progress(console=console) as progress, \
+                    ThreadPoolExecutor(max_workers=workers, thread_name_prefix="github-accounts") as executor:
+                task_id = progress.add_task("Collecting accounts", total=len(accounts))
+                futures = {
+                    executor.submit(collect_account, args, account, token, Console(quiet=True),
+                                    snapshots, checkpointed, deadline): account[1]
+                    for account in accounts
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logging.error(f"Collection failed for {name}: {e}", exc_info=True)
+                    if results[name] is None:
+                        console.print(f"[error]Could not retrieve repository data for {name}.[/error]")
+                    progress.advance(task_id)
+    finally:
+        checkpoint = disable_checkpoint()
+        if all(repositories is not None for repositories in results.values()):
+            checkpoint.discard()
+        else:
+            checkpoint.close()
+            logging.warning(f"Collection incomplete; finished repositories are in {CHECKPOINT_FILE} "
+                            f"({checkpoint.written} written this run). Rerun with --resume to skip them.")
+        logging.info(f"Response memo: {disable_response_memo()}")
+        save_metric_cache(disable_metric_cache())
+        save_immutable_cache(disable_immutable_cache())
+        save_repository_snapshots(snapshots)
+        save_validator_store(disable_conditional_requests())
+        logging.info(f"Rate-limit budget after collection: {rate_limit_snapshot()}")
+
+    if any(repositories is None for repositories in results.values()):
+        return results
+    cut_off = [repo.get('full_name') for repositories in results.values() for repo in repositories
+               if not repo.get('processed_details')]
+    if cut_off:
+        logging.warning(f"Not caching results: {len(cut_off)} repositories were cut off by the deadline; "
+                        f"the next run fetches them again.")
+    else:
+        save_cache({'repositories': merge_portfolios(results), 'accounts': results}, key=result_cache_key(accounts))
+    return results
+
+
+def merge_portfolios(results):
+    """All accounts' repositories in one list sorted by stars; failed accounts are skipped."""
+    merged = {}
+    for repositories in results.values():
+        for repo in repositories or []:
+            merged.setdefault(repo['full_name'], repo)
+    return sorted(merged.values(), key=lambda repo: repo.get('stars', 0) or 0, reverse=True)
+
+
+def publish_repositories(user_repositories, output_dir, console, filename="repositories-data.json"):
+    """Write a static API file, public_data/repositories-data.json by default; returns True on success."""
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    static_api_filename = os.path.join(output_dir, filename)
+
+    def write_static_api():
+        save_to_json(user_repositories, filename=static_api_filename)
+
+    if not safe_file_write(static_api_filename, write_static_api):
+        console.print(f"[error]Failed to write static API JSON file: {static_api_filename}[/error]")
+        return False
+    return True
+
+
+def publish_portfolio(results, output_dir, console):
+    """Write repositories-data-{account}.json per account (when there are several) and the merged repositories-data.json.
+
+    The merged file is only rewritten when every account was collected, so a
+    failed account never drops out of the published portfolio.
+    """
+    published = True
+    if len(results) > 1:
+        for name, repositories in results.items():
+            if repositories is not None:
+                filename = f"repositories-data-{name}.json"
+                published = publish_repositories(repositories, output_dir, console, filename) and published
+    if any(repositories is None for repositories in results.values()):
+        return False
+    return publish_repositories(merge_portfolios(results), output_dir, console) and published
+
+
+def main(argv=None):
     """Main function with comprehensive error handling and validation."""
+    args = parse_args(argv)
     start_time = time.time()
     console = Console()
+    enable_hedging(args.hedge)
+    set_run_now()
 
     try:
-        target_username = 'fabriziosalmi'
-        github_token = os.environ.get('MY_PAT')
+        accounts = requested_accounts(args)
+        account_names = ", ".join(name for _, name in accounts)
+        github_tokens = read_github_tokens()
+        github_token = github_tokens[0] if github_tokens else None
         output_dir = 'public_data'
 
-        console.print(f"[info]Fetching repository statistics for user: [bold]{target_username}[/bold]...[/]")
+        console.print(f"[info]Fetching repository statistics for: [bold]{account_names}[/bold]...[/]")
         if not github_token:
             console.print("[warning]Environment variable 'MY_PAT' not set. Using unauthenticated requests (lower rate limits).[/warning]")
+        elif configure_token_pool(github_tokens):
+            console.print(f"[info]Using a pool of {len(github_tokens)} GitHub tokens (MY_PAT + GITHUB_TOKENS).[/info]")
         else:
             console.print("[info]Using GitHub token from MY_PAT environment variable.[/info]")
 
-        cached_data = load_cache()
+        cache_key = result_cache_key(accounts)
+        cached_data = load_cache(cache_key)
+        published_stale = False
         if cached_data:
             console.print("[info]Using cached data to avoid API rate limits.[/info]")
-            user_repositories = cached_data.get('repositories', [])
+            results = cached_results(cached_data, accounts)
         else:
-            user_repositories, _, _ = get_user_repositories_stats(
-                target_username, github_token, console
-            )
-
-            if user_repositories is not None:
-                save_cache({'repositories': user_repositories})
-
-        if user_repositories is not None:
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-
-            static_api_filename = os.path.join(output_dir, "repositories-data.json")
-
-            def write_static_api():
-                save_to_json(user_repositories, filename=static_api_filename)
-
-            if not safe_file_write(static_api_filename, write_static_api):
-                console.print(f"[error]Failed to write static API JSON file: {static_api_filename}[/error]")
-                return False
-
+            if args.stale_while_revalidate:
+                stale_data, age = load_stale_cache(cache_key)
+                if stale_data and publish_portfolio(cached_results(stale_data, accounts), output_dir, console):
+                    published_stale = True
+                    console.print(f"[info]Published stale data ({age / 3600:.1f}h old); refreshing now.[/info]")
+            results = collect_repositories(args, accounts, github_token, console,
+                                           deadline=detail_deadline(start_time, args.deadline))
+            failed = [name for name, repositories in results.items() if repositories is None]
+            if failed and published_stale:
+                console.print(f"[warning]Refresh failed for {', '.join(failed)}; keeping their stale data.[/warning]")
+                logging.warning(f"Refresh failed for {', '.join(failed)}; their stale output is left in place.")
+                if len(failed) == len(results):
+                    return True
+                stale_results = cached_results(stale_data, accounts)
+                results = {name: stale_results.get(name) if repositories is None else repositories
+                           for name, repositories in results.items()}
+
+        if publish_portfolio(results, output_dir, console):
             console.print("[info]All files generated successfully.[/info]")
             return True
 
-        console.print(f"[error]Could not retrieve repository data for {target_username}. Please check logs or username/token.[/error]")
-        logging.error(f"Failed to retrieve repository data for {target_username}")
+        failed = [name for name, repositories in results.items() if repositories is None]
+        if failed:
+            console.print(f"[error]Could not retrieve repository data for {', '.join(failed)}. Please check logs or username/token.[/error]")
+            logging.error(f"Failed to retrieve repository data for {', '.join(failed)}")
         return False
 
     except KeyboardInterrupt:
@@ -393,6 +1125,11 @@ def main():
         logging.error(f"Critical error in main function: {e}", exc_info=True)
         return False
     finally:
+        close_session()
+        close_cache_store()
+        write_request_metrics()
+        for helper, memo in memo_stats().items():
+            logging.info(f"Memo {helper}: {memo['hits']} hits, {memo['misses']} misses ({memo['hit_rate']:.0%}), {memo['size']} entries")
         end_time = time.time()
         console.print(f"[info]Script finished in {end_time - start_time:.2f} seconds.[/info]")
 
@@ -194,6 +194,73 @@ def test_github_api_connection():
         print(f"  ❌ FAIL: Exception during API test: {e}")
         return False
 
+def test_cassette_replay():
+    """Replay a recorded GitHub response through make_github_request without network access."""
+    print("\n📼 Testing Cassette Replay...")
+
+    import tempfile
+    import requests
+    from lib.cassette import CassetteStore, configure_cassette
+    from stats import make_github_request
+
+    url = "https://api.github.com/users/octocat/repos"
+    headers = {"Accept": "application/vnd.github.v3+json", "Authorization": "token recorded"}
+    params = {"per_page": 100}
+
+    recorded = requests.Response()
+    recorded.status_code = 200
+    recorded.headers["Content-Type"] = "application/json"
+    recorded._content = json.dumps([{"name": "hello-world", "stargazers_count": 42}]).encode("utf-8")
+    recorded.url = url
+
+    with tempfile.TemporaryDirectory() as cassette_dir:
+        CassetteStore(cassette_dir, "record").record("GET", url, headers, params, None, recorded, 0.05)
+        configure_cassette("replay", cassette_dir)
+        try:
+            # A different token must not change which recording is served.
+            response = make_github_request(url, dict(headers, Authorization="token other"), params=params, retries=0)
+            missing = make_github_request(f"{url}?page=2", headers, retries=0)
+        finally:
+            configure_cassette("off")
+
+    passed = (
+        response is not None
+        and response.status_code == 200
+        and response.json()[0]["stargazers_count"] == 42
+        and missing is None
+    )
+    status = "✅ PASS" if passed else "❌ FAIL"
+    print(f"  {status}: Replayed {url} offline; unrecorded request returned None")
+    assert passed
+
+def test_task_graph():
+    """Run a small metric DAG: dependents see their inputs, failures skip dependents."""
+    print("\n🕸️ Testing Metric Task Graph...")
+
+    from lib.scheduler import DependencyFailed, MetricTask, run_task_graph
+
+    def broken():
+        raise RuntimeError("boom")
+
+    tasks = [
+        MetricTask('contributors', lambda: 12),
+        MetricTask('avg_resolution', lambda: 3600.0),
+        MetricTask('bus_factor', lambda contributors: contributors // 4, ['contributors']),
+        MetricTask('issue_health', lambda avg, contributors: (avg, contributors), ['avg_resolution', 'contributors']),
+        MetricTask('version', broken),
+        MetricTask('summary', lambda version, bus: (version, bus), ['version', 'bus_factor']),
+    ]
+    for workers in (1, 4):
+        results, errors = run_task_graph(tasks, workers=workers)
+        passed = (
+            results == {'contributors': 12, 'avg_resolution': 3600.0, 'bus_factor': 3, 'issue_health': (3600.0, 12)}
+            and isinstance(errors['version'], RuntimeError)
+            and isinstance(errors['summary'], DependencyFailed)
+        )
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"  {status}: workers={workers} -> {sorted(results)} ok, {sorted(errors)} failed")
+        assert passed
+
 def main():
     """Run all tests."""
     print("🚀 GitHub Repository Stats - Test Suite")
@@ -205,6 +272,8 @@ def main():
     test_data_validation()
     test_safe_file_write()
     test_insights_generation()
+    test_cassette_replay()
+    test_task_graph()
     api_ok = test_github_api_connection()
     
     print("\n" + "=" * 50)
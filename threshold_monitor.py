@@ -4,13 +4,14 @@ Aegis Threshold Monitor - Real-time Milestone & Alert Detection
 Compares current data with previous state to detect significant changes
 """
 
-import json
 import os
 import sys
 from typing import Dict, List, Any, Tuple
-import requests
 from datetime import datetime
 
+from lib import codec
+from lib.github_api import get_session
+
 class ThresholdMonitor:
     # Milestone thresholds for stars
     STAR_MILESTONES = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
@@ -33,8 +34,8 @@ class ThresholdMonitor:
             return []
         
         try:
-            with open(path, 'r') as f:
-                return json.load(f)
+            with open(path, 'rb') as f:
+                return codec.load(f)
         except Exception as e:
             print(f"Warning: Could not load {path}: {e}")
             return []
@@ -202,7 +203,7 @@ class ThresholdMonitor:
             return False
         
         try:
-            response = requests.post(self.webhook_url, json=payload)
+            response = get_session().post(self.webhook_url, json=payload)
             response.raise_for_status()
             print("✅ Alert sent to webhook")
             return True